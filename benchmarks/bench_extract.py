@@ -0,0 +1,71 @@
+"""
+Compare template extraction into an existing project directory.
+
+The legacy path extracts the archive into a temporary directory and copies
+every file again into the project; extract_template streams each member
+straight to its destination.
+
+    PYTHONPATH=src python benchmarks/bench_extract.py --files 3000 --size 16384
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from forge.downloader import extract_template
+
+def build_archive(path: Path, files: int, size: int) -> None:
+    payload = os.urandom(size)
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for i in range(files):
+            zf.writestr(f"forge-template/dir{i % 50}/file{i}.md", payload)
+
+def legacy_extract(zip_ref: zipfile.ZipFile, project_path: Path) -> None:
+    """The temp-directory round trip download_and_extract_template used before."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        zip_ref.extractall(temp_path)
+        items = list(temp_path.iterdir())
+        source_dir = items[0] if len(items) == 1 and items[0].is_dir() else temp_path
+        for item in source_dir.iterdir():
+            dest_path = project_path / item.name
+            if item.is_dir():
+                for sub_item in item.rglob("*"):
+                    if sub_item.is_file():
+                        dest_file = dest_path / sub_item.relative_to(item)
+                        dest_file.parent.mkdir(parents=True, exist_ok=True)
+                        shutil.copy2(sub_item, dest_file)
+            else:
+                shutil.copy2(item, dest_path)
+
+def timed(label: str, archive: Path, root: Path, extract) -> float:
+    project = root / label
+    project.mkdir()
+    start = time.perf_counter()
+    with zipfile.ZipFile(archive) as zip_ref:
+        extract(zip_ref, project)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {elapsed * 1000:8.1f} ms")
+    return elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=3000)
+    parser.add_argument("--size", type=int, default=16384, help="Bytes per file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        archive = root / "template.zip"
+        build_archive(archive, args.files, args.size)
+        print(f"{args.files} files of {args.size} bytes")
+        legacy = timed("legacy", archive, root, legacy_extract)
+        stream = timed("streaming", archive, root,
+                       lambda zip_ref, project: extract_template(zip_ref, project, verbose=False))
+        print(f"speedup x{legacy / stream:.1f}")
+
+if __name__ == "__main__":
+    main()
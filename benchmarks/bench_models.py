@@ -0,0 +1,126 @@
+"""
+Micro-benchmark for FeatureState serialization and memory.
+
+Compares the slotted models with hand-written to_dict/from_dict against the
+previous plain dataclasses serialized with dataclasses.asdict and rebuilt via
+Task(**kwargs), on a feature with many tasks and quality gates.
+
+    PYTHONPATH=src python benchmarks/bench_models.py --tasks 50000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from forge.models import FeatureState, Phase, QualityGate, Status, Task
+
+# The models as they were before slots and the hand-written codec
+
+@dataclass
+class LegacyTask:
+    id: str
+    description: str
+    status: Status = Status.PENDING
+    file_path: Optional[str] = None
+    test_file: Optional[str] = None
+
+@dataclass
+class LegacyQualityGate:
+    name: str
+    passed: bool
+    timestamp: str
+    details: Optional[str] = None
+
+@dataclass
+class LegacyFeatureState:
+    name: str
+    phase: Phase = Phase.INIT
+    status: Status = Status.PENDING
+    tasks: List[LegacyTask] = field(default_factory=list)
+    artifacts: Dict[str, str] = field(default_factory=dict)
+    quality_gates: List[LegacyQualityGate] = field(default_factory=list)
+    created_at: str = ""
+    updated_at: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LegacyFeatureState":
+        return cls(
+            name=data["name"],
+            phase=Phase(data.get("phase", Phase.INIT)),
+            status=Status(data.get("status", Status.PENDING)),
+            tasks=[LegacyTask(**t) for t in data.get("tasks", [])],
+            artifacts=data.get("artifacts", {}),
+            quality_gates=[LegacyQualityGate(**q) for q in data.get("quality_gates", [])],
+            created_at=data.get("created_at", ""),
+            updated_at=data.get("updated_at", ""),
+        )
+
+def build(cls_state, cls_task, cls_gate, tasks: int):
+    statuses = list(Status)
+    return cls_state(
+        name="bench",
+        phase=Phase.IMPLEMENT,
+        tasks=[
+            cls_task(f"T{i}", f"Task number {i}", statuses[i % len(statuses)], f"src/mod{i % 97}.py", None)
+            for i in range(tasks)
+        ],
+        quality_gates=[cls_gate(f"gate{i % 7}", i % 3 != 0, "2025-01-01T00:00:00") for i in range(tasks // 10)],
+    )
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def resident(factory: Callable[[], Any]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    obj = factory()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del obj
+    return size
+
+def measure(label: str, state_cls, task_cls, gate_cls, tasks: int, repeat: int, compact: bool) -> Dict[str, float]:
+    state = build(state_cls, task_cls, gate_cls, tasks)
+    dump_kwargs = {"separators": (",", ":")} if compact else {"indent": 2}
+    text = json.dumps(state.to_dict(), **dump_kwargs)
+    results = {
+        "save": best_of(lambda: json.dumps(state.to_dict(), **dump_kwargs), repeat),
+        "load": best_of(lambda: state_cls.from_dict(json.loads(text)), repeat),
+        "bytes": len(text),
+        "memory": resident(lambda: state_cls.from_dict(json.loads(text))),
+    }
+    print(
+        f"{label:<22} save {results['save'] * 1000:8.1f} ms   load {results['load'] * 1000:8.1f} ms   "
+        f"file {results['bytes'] / 1e6:6.2f} MB   resident {results['memory'] / 1e6:6.1f} MB"
+    )
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tasks", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{args.tasks} tasks, {args.tasks // 10} quality gates, best of {args.repeat}")
+    legacy = measure("legacy (asdict, indent)", LegacyFeatureState, LegacyTask, LegacyQualityGate,
+                     args.tasks, args.repeat, compact=False)
+    measure("slotted (indent)", FeatureState, Task, QualityGate, args.tasks, args.repeat, compact=False)
+    fast = measure("slotted (compact)", FeatureState, Task, QualityGate, args.tasks, args.repeat, compact=True)
+    print(
+        f"speedup: save x{legacy['save'] / fast['save']:.1f}, load x{legacy['load'] / fast['load']:.1f}, "
+        f"memory x{legacy['memory'] / fast['memory']:.1f}"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Hammer the workflow state store from several processes at once.
+
+Each worker interleaves journaled task updates (update_task) with
+read-modify-write updates (update_state) of a shared counter. At the end the
+counter and task count must match exactly what was written; any lost update
+fails the run.
+
+    PYTHONPATH=src python benchmarks/bench_state.py --processes 8 --ops 200
+    PYTHONPATH=src python benchmarks/bench_state.py --backend sqlite
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from forge.models import FeatureState
+from forge.state import StateConflictError, get_state_store, load_state, migrate_state, save_state, update_task
+
+def worker(path: str, worker_id: int, ops: int, conflicts) -> None:
+    os.chdir(path)
+    store = get_state_store()
+    retries = 0
+    for i in range(ops):
+        update_task(f"W{worker_id}-{i}", description="bench", file_path=f"src/mod{i % 16}.py")
+        # Same loop as forge.state.update_state, counting the retries
+        while True:
+            state = store.load()
+            state.artifacts["counter"] = str(int(state.artifacts.get("counter", "0")) + 1)
+            try:
+                store.save(state, expected_version=state.version)
+                break
+            except StateConflictError:
+                retries += 1
+    with conflicts.get_lock():
+        conflicts.value += retries
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", "-n", type=int, default=4)
+    parser.add_argument("--ops", type=int, default=100, help="Operations of each kind per process")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        save_state(FeatureState(name="bench"))
+        if args.backend == "sqlite":
+            migrate_state("sqlite")
+
+        conflicts = multiprocessing.Value("i", 0)
+        procs = [
+            multiprocessing.Process(target=worker, args=(tmp, w, args.ops, conflicts))
+            for w in range(args.processes)
+        ]
+        start = time.perf_counter()
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        state = load_state()
+        total = args.processes * args.ops
+        counter = int(state.artifacts.get("counter", "0"))
+        tasks = len({t.id for t in state.tasks})
+        print(f"backend={args.backend} processes={args.processes} ops/process={args.ops * 2}")
+        print(f"elapsed={elapsed:.2f}s  throughput={2 * total / elapsed:.0f} writes/s  conflicts={conflicts.value}")
+        print(f"counter={counter}/{total}  tasks={tasks}/{total}  version={state.version}")
+        ok = counter == total and tasks == total and all(p.exitcode == 0 for p in procs)
+        print("OK" if ok else "LOST UPDATES")
+        os.chdir(Path(tmp).parent)
+        return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
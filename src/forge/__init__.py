@@ -1,4 +1,14 @@
-from forge.cli import main
+import sys
+
+def main():
+    # Hand the command to a running `forge serve` daemon before importing the CLI
+    from forge.daemon import forward
+
+    exit_code = forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+    from forge.cli import main as cli_main
+    cli_main()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,213 @@
+import hashlib
+import io
+import json
+import os
+import stat
+import tarfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from forge.cache import file_digest
+from forge.config import AGENT_CONFIG
+from forge.filesystem import atomic_writer, merge_vscode_settings
+from forge.logging import StepTracker, console
+
+BUNDLE_FORMAT = 1
+# Always the first member of a bundle, so it can be read before any file data
+MANIFEST_NAME = "forge-bundle.json"
+# Where the template library is installed in a project; see get_search_paths
+TEMPLATES_TARGET = ".forge/templates"
+BUNDLE_CHUNK_SIZE = 1 << 20
+
+class BundleError(Exception):
+    """Raised for a bundle that is malformed or does not match its manifest."""
+
+def find_templates_root() -> Optional[Path]:
+    """The templates/ directory of the current directory or of the forge checkout."""
+    for root in (Path.cwd(), Path(__file__).parent.parent.parent):
+        if (root / "templates").is_dir():
+            return root / "templates"
+    return None
+
+def agent_template_dir(templates_root: Path, ai_assistant: str) -> Optional[Path]:
+    """The templates/ subdirectory holding an agent's files, named with or without the dot."""
+    folder = AGENT_CONFIG[ai_assistant]["folder"].strip("/")
+    for name in (folder, folder.lstrip(".")):
+        if (templates_root / name).is_dir():
+            return templates_root / name
+    return None
+
+def _walk_files(base: Path) -> Iterator[Tuple[str, Path]]:
+    for dirpath, dirnames, filenames in os.walk(base):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = Path(dirpath) / name
+            yield path.relative_to(base).as_posix(), path
+
+def bundle_sources(templates_root: Path, ai_assistant: str) -> Dict[str, Path]:
+    """Map each project-relative path of a bundle to the template file it comes from.
+
+    structure/ and the agent directory land where init --local puts them; the
+    rest of the template library is installed under .forge/templates.
+    Later sources win when two map to the same path.
+    """
+    agent_dirs = {"structure"}
+    for config in AGENT_CONFIG.values():
+        folder = config["folder"].strip("/")
+        agent_dirs.update((folder, folder.lstrip(".")))
+
+    sources: Dict[str, Path] = {}
+    for entry in sorted(os.scandir(templates_root), key=lambda e: e.name):
+        if entry.name in agent_dirs:
+            continue
+        path = Path(entry.path)
+        if entry.is_dir():
+            for rel, file in _walk_files(path):
+                sources[f"{TEMPLATES_TARGET}/{entry.name}/{rel}"] = file
+        elif entry.is_file():
+            sources[f"{TEMPLATES_TARGET}/{entry.name}"] = path
+    for rel, file in _walk_files(templates_root / "structure"):
+        sources[rel] = file
+    agent_dir = agent_template_dir(templates_root, ai_assistant)
+    if agent_dir is not None:
+        folder = AGENT_CONFIG[ai_assistant]["folder"].strip("/")
+        for rel, file in _walk_files(agent_dir):
+            sources[f"{folder}/{rel}"] = file
+    return sources
+
+def _forge_version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version("forge")
+    except PackageNotFoundError:
+        return "dev"
+
+def create_bundle(templates_root: Path, ai_assistant: str, output: Path, version: Optional[str] = None) -> Dict[str, Any]:
+    """Write a bundle of the templates for one agent to output and return its manifest.
+
+    A bundle is a gzipped tar whose first member is a JSON manifest listing
+    every file with its final path, mode, size and sha256. The files follow in
+    the same order, already laid out as they appear in a project.
+    """
+    if ai_assistant not in AGENT_CONFIG:
+        raise BundleError(f"Unknown agent: {ai_assistant}")
+    sources = bundle_sources(templates_root, ai_assistant)
+    if not sources:
+        raise BundleError(f"No template files found in {templates_root}")
+    files = []
+    for rel, path in sources.items():
+        st = path.stat()
+        files.append({"path": rel, "mode": stat.S_IMODE(st.st_mode), "size": st.st_size, "sha256": file_digest(path)})
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": version or _forge_version(),
+        "ai": ai_assistant,
+        "created_at": datetime.now().isoformat(),
+        "files": files,
+    }
+    data = json.dumps(manifest, indent=2).encode("utf-8")
+    with atomic_writer(output, binary=True) as f, tarfile.open(fileobj=f, mode="w:gz") as tar:
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(data)
+        info.mode = 0o644
+        tar.addfile(info, io.BytesIO(data))
+        for entry in files:
+            info = tarfile.TarInfo(entry["path"])
+            info.size = entry["size"]
+            info.mode = entry["mode"]
+            with open(sources[entry["path"]], "rb") as source:
+                tar.addfile(info, source)
+    return manifest
+
+def _read_manifest(tar: tarfile.TarFile) -> Dict[str, Any]:
+    member = tar.next()
+    if member is None or member.name != MANIFEST_NAME or not member.isfile():
+        raise BundleError(f"Not a forge bundle: the first member must be {MANIFEST_NAME}")
+    try:
+        manifest = json.loads(tar.extractfile(member).read())
+    except ValueError as e:
+        raise BundleError(f"Invalid bundle manifest: {e}")
+    if not isinstance(manifest, dict) or manifest.get("format") != BUNDLE_FORMAT:
+        raise BundleError(f"Unsupported bundle: {MANIFEST_NAME} is not format {BUNDLE_FORMAT}")
+    return manifest
+
+def read_bundle_manifest(path: Path) -> Dict[str, Any]:
+    """Read just the manifest at the start of a bundle."""
+    try:
+        with tarfile.open(path, "r|gz") as tar:
+            return _read_manifest(tar)
+    except tarfile.TarError as e:
+        raise BundleError(f"Not a forge bundle: {e}")
+
+def _safe_parts(path: str) -> Tuple[str, ...]:
+    parts = tuple(path.split("/"))
+    if not path or path.startswith("/") or any(part in ("", ".", "..") for part in parts):
+        raise BundleError(f"Unsafe path in bundle: {path!r}")
+    return parts
+
+def _check_digest(entry: Dict[str, Any], digest: Any) -> None:
+    if digest.hexdigest() != entry["sha256"]:
+        raise BundleError(f"Checksum mismatch for {entry['path']}")
+
+def apply_bundle(
+    path: Path,
+    project_path: Path,
+    *,
+    verbose: bool = False,
+    tracker: StepTracker | None = None,
+) -> Dict[str, Any]:
+    """Install a bundle into project_path in one sequential read; returns its manifest.
+
+    Paths come from the manifest as they are, so there is nothing to probe or
+    flatten. Every file is checked against its manifest size and sha256, and
+    an existing .vscode/settings.json is merged rather than overwritten.
+    """
+    if tracker:
+        tracker.start("bundle", path.name)
+    try:
+        with tarfile.open(path, "r|gz") as tar:
+            manifest = _read_manifest(tar)
+            expected = {entry["path"]: entry for entry in manifest["files"]}
+            project_path.mkdir(parents=True, exist_ok=True)
+            made_dirs = set()
+            for member in iter(tar.next, None):
+                entry = expected.pop(member.name, None)
+                if entry is None or not member.isfile() or member.size != entry["size"]:
+                    raise BundleError(f"Bundle member {member.name!r} does not match the manifest")
+                parts = _safe_parts(member.name)
+                dest = project_path.joinpath(*parts)
+                if dest.parent not in made_dirs:
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    made_dirs.add(dest.parent)
+                source = tar.extractfile(member)
+                digest = hashlib.sha256()
+                if parts[-2:] == (".vscode", "settings.json") and dest.exists():
+                    content = source.read()
+                    digest.update(content)
+                    _check_digest(entry, digest)
+                    merge_vscode_settings(content, dest, Path(*parts), verbose, tracker)
+                    continue
+                # Checked before it replaces anything, so a tampered bundle
+                # leaves existing files as they were
+                with atomic_writer(dest, binary=True) as out:
+                    for chunk in iter(lambda: source.read(BUNDLE_CHUNK_SIZE), b""):
+                        digest.update(chunk)
+                        out.write(chunk)
+                    _check_digest(entry, digest)
+                os.chmod(dest, entry["mode"] & 0o777)
+            if expected:
+                raise BundleError(f"Bundle is missing {len(expected)} file(s) listed in its manifest")
+    except BundleError as e:
+        if tracker:
+            tracker.error("bundle", str(e))
+        raise
+    except (tarfile.TarError, OSError) as e:
+        if tracker:
+            tracker.error("bundle", str(e))
+        raise BundleError(f"Could not apply bundle {path}: {e}") from e
+    if tracker:
+        tracker.complete("bundle", f"{len(manifest['files'])} files, version {manifest.get('version', '?')}")
+    elif verbose:
+        console.print(f"[cyan]Applied bundle {path.name}:[/cyan] {len(manifest['files'])} files")
+    return manifest
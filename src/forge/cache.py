@@ -0,0 +1,317 @@
+import hashlib
+import json
+import os
+import stat
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+from forge.filesystem import atomic_writer
+from forge.state import get_forge_path
+
+CACHE_DIR_NAME = "cache"
+CACHE_FORMAT = 1
+
+# (mtime_ns, size) of a path, or None when it does not exist
+Stamp = Optional[Tuple[int, int]]
+
+def get_cache_dir() -> Optional[Path]:
+    """Get the path to the compile cache in the current project, or None outside a project.
+
+    The cache never creates .forge itself: find_project_root would then take
+    a directory that merely ran a compile for the project root.
+    """
+    forge_path = get_forge_path()
+    return forge_path / CACHE_DIR_NAME if forge_path.is_dir() else None
+
+def cache_disabled() -> bool:
+    """Return True when FORGE_NO_CACHE is set to anything but an empty string or 0."""
+    return os.getenv("FORGE_NO_CACHE", "").strip() not in ("", "0")
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def stat_stamp(path: Path) -> Stamp:
+    """Return the (mtime_ns, size) stamp of path, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+class Dependencies(dict):
+    """
+    Paths a cached result is computed from, mapped to their stamp from before they were read.
+
+    add() stamps a path the first time it is seen, so add each path before
+    reading it; files read elsewhere (e.g. by a TemplateEngine) are added with
+    the stamp taken then. An edit made while compiling thus never ends up
+    recorded as the state the output was built from.
+    """
+
+    def __init__(self, paths: Iterable[Path] = ()):
+        super().__init__()
+        self.add_all(paths)
+
+    def add(self, path: Path) -> None:
+        """Stamp path now, unless it is already recorded."""
+        if path not in self:
+            self[path] = stat_stamp(path)
+
+    def add_all(self, paths: Iterable[Path]) -> None:
+        """Stamp every path not already recorded."""
+        for path in paths:
+            self.add(path)
+
+def dependency_record(path: Path, stamp: Stamp) -> Dict[str, Any]:
+    """Snapshot a dependency as read: its stamp, plus a content hash for files.
+
+    Directories are recorded so that adding or removing a template (which changes
+    how names resolve) invalidates the artifact. Missing paths are recorded too,
+    so creating them later is noticed. A file that changed since stamp was
+    taken gets no hash, so the entry can never be confirmed and just misses.
+    """
+    if stamp is None:
+        return {"path": str(path), "missing": True}
+    record = {"path": str(path), "mtime_ns": stamp[0], "size": stamp[1]}
+    try:
+        st = path.stat()
+        if (st.st_mtime_ns, st.st_size) == stamp and not stat.S_ISDIR(st.st_mode):
+            digest = file_digest(path)
+            # The hashed bytes are only the ones read if nothing changed meanwhile
+            if stat_stamp(path) == stamp:
+                record["sha256"] = digest
+    except OSError:
+        pass
+    return record
+
+def _is_current(record: Dict[str, Any]) -> bool:
+    path = Path(record["path"])
+    try:
+        st = path.stat()
+    except OSError:
+        return bool(record.get("missing"))
+    if record.get("missing"):
+        return False
+    if st.st_mtime_ns == record["mtime_ns"] and st.st_size == record["size"]:
+        return True
+    # Touched but possibly unchanged: only files can be confirmed by content.
+    if "sha256" not in record or st.st_size != record["size"]:
+        return False
+    try:
+        return file_digest(path) == record["sha256"]
+    except OSError:
+        return False
+
+class CompileCache:
+    """
+    Persistent store of compiled artifacts under .forge/cache.
+
+    Each entry records the dependency set it was built from. A lookup returns
+    the stored output only while every dependency still matches, which costs a
+    stat per dependency instead of re-reading and re-expanding templates.
+    Outside a project (no .forge directory) nothing is cached.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.cache_dir = cache_dir or get_cache_dir()
+
+    def enabled(self) -> bool:
+        """True when there is a cache directory and FORGE_NO_CACHE is not set."""
+        return self.cache_dir is not None and not cache_disabled()
+
+    def _entry_paths(self, key: str):
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+        return self.cache_dir / f"{name}.json", self.cache_dir / f"{name}.out"
+
+    def get_path(self, key: str) -> Optional[Path]:
+        """Return the file holding the cached output for key, or None if absent or stale."""
+        if not self.enabled():
+            return None
+        meta_path, out_path = self._entry_paths(key)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("format") != CACHE_FORMAT or meta.get("key") != key:
+                return None
+            if not all(_is_current(record) for record in meta["dependencies"]):
+                return None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        return out_path if out_path.exists() else None
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached output for key, or None if absent or stale."""
+        out_path = self.get_path(key)
+        if out_path is None:
+            return None
+        try:
+            return out_path.read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def put(self, key: str, output: str, dependencies: Union[Mapping[Path, Stamp], Iterable[Path]]) -> None:
+        """Store output for key along with a snapshot of its dependencies.
+
+        Plain paths are stamped now; pass Dependencies stamped before reading
+        when the output may take a while to compute.
+        """
+        if not isinstance(dependencies, Mapping):
+            dependencies = Dependencies(dependencies)
+        for _ in self.record(key, [output], dependencies):
+            pass
+
+    def record(self, key: str, chunks: Iterable[str], dependencies: Mapping[Path, Stamp]) -> Iterator[str]:
+        """Pass chunks through unchanged while storing them as the output for key.
+
+        dependencies maps each path to its stamp from when it was read (see
+        Dependencies). It may keep growing while chunks are produced and is
+        only recorded once the stream is exhausted. Nothing is stored if the
+        consumer stops early.
+        """
+        if not self.enabled():
+            yield from chunks
+            return
+        meta_path, out_path = self._entry_paths(key)
+        with ExitStack() as stack:
+            try:
+                # Output first: a metadata file never points at a missing or partial blob.
+                blob = stack.enter_context(atomic_writer(out_path))
+            except OSError:
+                # The cache is an optimisation; a read-only project must still compile.
+                yield from chunks
+                return
+            for chunk in chunks:
+                blob.write(chunk)
+                yield chunk
+        meta = {
+            "format": CACHE_FORMAT,
+            "key": key,
+            "dependencies": [dependency_record(p, dependencies[p]) for p in sorted(dependencies)],
+        }
+        try:
+            with atomic_writer(meta_path) as f:
+                json.dump(meta, f)
+        except OSError:
+            pass
+
+# Upper bound on cached release archives; least recently used ones go first
+RELEASE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+def get_user_cache_dir() -> Path:
+    """Per-user cache shared by all projects: $FORGE_CACHE_DIR, else the platform cache dir."""
+    configured = os.getenv("FORGE_CACHE_DIR")
+    if configured:
+        return Path(configured)
+    from platformdirs import user_cache_dir
+    return Path(user_cache_dir("forge"))
+
+def release_cache_max_bytes() -> int:
+    """Size limit for cached archives, from FORGE_CACHE_MAX_BYTES if set."""
+    try:
+        return int(os.getenv("FORGE_CACHE_MAX_BYTES", ""))
+    except ValueError:
+        return RELEASE_CACHE_MAX_BYTES
+
+def _safe_name(name: str) -> str:
+    # Tag and asset names come from the network; never let them leave the cache
+    name = name.replace("/", "_").replace("\\", "_")
+    return "_" + name if name in ("", ".", "..") else name
+
+class ReleaseCache:
+    """
+    User-level cache of GitHub release metadata and template archives.
+
+    Release JSON is stored with its ETag so the next lookup can be a
+    conditional request; a 304 costs no download and no API rate limit.
+    Archives are keyed by release tag and asset name, which GitHub never
+    reuses for different content, and evicted least recently used first once
+    they exceed the size limit.
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or get_user_cache_dir()
+        self.max_bytes = release_cache_max_bytes() if max_bytes is None else max_bytes
+        self.releases_dir = self.cache_dir / "releases"
+        self.archives_dir = self.cache_dir / "archives"
+
+    def _release_path(self, url: str) -> Path:
+        return self.releases_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()[:32]}.json"
+
+    def get_release(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return {"etag": ..., "data": ...} last stored for url, or None."""
+        try:
+            with open(self._release_path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if entry.get("url") != url:
+                return None
+            return {"etag": entry.get("etag"), "data": entry["data"]}
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put_release(self, url: str, etag: Optional[str], data: Any) -> None:
+        """Store the release JSON fetched from url along with its ETag."""
+        try:
+            with atomic_writer(self._release_path(url)) as f:
+                json.dump({"url": url, "etag": etag, "data": data}, f)
+        except OSError:
+            pass
+
+    def archive_path(self, tag: str, name: str) -> Path:
+        """Where the archive for this release tag and asset name is kept."""
+        return self.archives_dir / _safe_name(tag) / _safe_name(name)
+
+    def get_archive(
+        self, tag: str, name: str, size: Optional[int] = None, sha256: Optional[str] = None
+    ) -> Optional[Path]:
+        """Return the cached archive if present (and of the expected size and digest), marking it used."""
+        path = self.archive_path(tag, name)
+        try:
+            if size is not None and path.stat().st_size != size:
+                return None
+            if sha256 is not None and file_digest(path) != sha256.lower():
+                return None
+            # mtime doubles as the last-use time for eviction
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def evict(self, keep: Iterable[Path] = ()) -> None:
+        """Delete least recently used archives until the total fits the size limit."""
+        keep = set(keep)
+        entries = []
+        try:
+            tag_dirs = list(os.scandir(self.archives_dir))
+        except OSError:
+            return
+        for tag_dir in tag_dirs:
+            try:
+                with os.scandir(tag_dir.path) as files:
+                    for entry in files:
+                        # Skip in-progress downloads (atomic_writer temp files)
+                        if entry.is_file() and not entry.name.startswith("."):
+                            st = entry.stat()
+                            entries.append((st.st_mtime_ns, st.st_size, Path(entry.path)))
+            except OSError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if path in keep:
+                continue
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                continue
+            try:
+                path.parent.rmdir()
+            except OSError:
+                pass
@@ -7,6 +7,9 @@ from forge.rules import app as rules_app
 from forge.commands.init import init_command
 from forge.commands.check import check_command
 from forge.commands.workflow import plan, tasks, implement, optimize
+from forge.commands.state import state_app
+from forge.commands.serve import serve_command
+from forge.commands.bundle import bundle_app
 
 app = typer.Typer(
     name="forge",
@@ -16,6 +19,8 @@ app = typer.Typer(
 )
 
 app.add_typer(rules_app, name="rules", help="Manage and compile project rules (.cursorrules, etc.)")
+app.add_typer(state_app, name="state", help="Inspect and update workflow state (tasks, quality gates)")
+app.add_typer(bundle_app, name="bundle", help="Build offline template bundles for forge init --bundle")
 
 @app.callback()
 def callback(ctx: typer.Context):
@@ -37,6 +42,7 @@ app.command(name="plan")(plan)
 app.command(name="tasks")(tasks)
 app.command(name="implement")(implement)
 app.command(name="optimize")(optimize)
+app.command(name="serve")(serve_command)
 
 def main():
     app()
@@ -0,0 +1,38 @@
+import typer
+from pathlib import Path
+from typing import Optional
+from forge.bundle import BundleError, create_bundle, find_templates_root
+from forge.config import AGENT_CONFIG
+from forge.utils import console
+
+bundle_app = typer.Typer(help="Build offline template bundles")
+
+@bundle_app.command("create")
+def create(
+    ai_assistant: str = typer.Option(..., "--ai", help="AI assistant the bundle is for"),
+    output: Optional[Path] = typer.Option(None, "--output", "-o", help="Bundle file to write (default: forge-bundle-<ai>.tar.gz)"),
+    templates: Optional[Path] = typer.Option(None, "--templates", help="templates/ directory to bundle (default: the one in this checkout)"),
+    version: Optional[str] = typer.Option(None, "--version", help="Version label recorded in the manifest"),
+):
+    """
+    Package the templates/ tree for one agent into a bundle for `forge init --bundle`.
+    """
+    if ai_assistant not in AGENT_CONFIG:
+        console.print(
+            f"[red]Error:[/red] Invalid AI assistant '{ai_assistant}'. Choose from: {', '.join(AGENT_CONFIG.keys())}"
+        )
+        raise typer.Exit(1)
+    templates_root = templates or find_templates_root()
+    if templates_root is None or not templates_root.is_dir():
+        console.print("[red]Error:[/red] Could not find a templates directory; pass --templates")
+        raise typer.Exit(1)
+    output = output or Path(f"forge-bundle-{ai_assistant}.tar.gz")
+    try:
+        manifest = create_bundle(templates_root, ai_assistant, output, version)
+    except BundleError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    size = sum(entry["size"] for entry in manifest["files"])
+    console.print(
+        f"[green]✓ Wrote {output}[/green] ({len(manifest['files'])} files, {size:,} bytes, version {manifest['version']})"
+    )
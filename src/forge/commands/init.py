@@ -2,25 +2,17 @@ import os
 import sys
 import shutil
 import shlex
-import ssl
-import httpx
 import typer
-import truststore
 from pathlib import Path
 from rich.panel import Panel
-from rich.live import Live
 
 from forge.config import AGENT_CONFIG, SCRIPT_TYPE_CHOICES
 from forge.utils import (
     console, StepTracker, select_with_arrows, show_banner, check_tool,
-    is_git_repo, init_git_repo, ensure_executable_scripts
+    is_git_repo, init_git_repo, ensure_executable_scripts, get_client
 )
-from forge.downloader import download_and_extract_template, copy_local_template
-from forge.state import save_state, FeatureState
-
-# Initialize SSL/Client
-ssl_context = truststore.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-client = httpx.Client(verify=ssl_context)
+from forge.state import StateStore, FeatureState
+from forge.project import FORGE_DIR, clear_project_root_cache
 
 def init_command(
     project_name: str = typer.Argument(
@@ -71,6 +63,16 @@ def init_command(
         "--local",
         help="Use local templates directory instead of downloading from GitHub (for development)",
     ),
+    bundle: Path = typer.Option(
+        None,
+        "--bundle",
+        help="Apply an offline template bundle (see 'forge bundle create') instead of downloading",
+    ),
+    pipeline: bool = typer.Option(
+        False,
+        "--pipeline",
+        help="Extract the template while it downloads (falls back if the server lacks Range support)",
+    ),
 ):
     """
     Initialize a new Forge project from the latest template.
@@ -96,6 +98,8 @@ def init_command(
         forge init --here
         forge init --here --force  # Skip confirmation when current directory not empty
         forge init my-project --local  # Use local templates (for dev)
+        forge init my-project --pipeline  # Extract while downloading
+        forge init my-project --bundle forge-bundle-claude.tar.gz  # Offline
     """
 
     show_banner()
@@ -173,6 +177,24 @@ def init_command(
                 "[yellow]Git not found - will skip repository initialization[/yellow]"
             )
 
+    if bundle:
+        if local_templates:
+            console.print("[red]Error:[/red] --bundle and --local cannot be combined")
+            raise typer.Exit(1)
+        from forge.bundle import BundleError, read_bundle_manifest
+        try:
+            bundle_ai = read_bundle_manifest(bundle)["ai"]
+        except (OSError, KeyError, BundleError) as e:
+            console.print(f"[red]Error:[/red] Cannot read bundle {bundle}: {e}")
+            raise typer.Exit(1)
+        if ai_assistant and ai_assistant != bundle_ai:
+            console.print(
+                f"[red]Error:[/red] Bundle {bundle.name} is for '{bundle_ai}', not '{ai_assistant}'"
+            )
+            raise typer.Exit(1)
+        # The bundle decides the agent
+        ai_assistant = bundle_ai
+
     if ai_assistant:
         if ai_assistant not in AGENT_CONFIG:
             console.print(
@@ -238,7 +260,9 @@ def init_command(
     tracker.add("script-select", "Select script type")
     tracker.complete("script-select", selected_script)
 
-    if local_templates:
+    if bundle:
+        tracker.add("bundle", "Apply template bundle")
+    elif local_templates:
         tracker.add("copy-local", "Copy local template")
     else:
         tracker.add("fetch", "Fetch latest release")
@@ -257,6 +281,10 @@ def init_command(
     ]:
         tracker.add(key, label)
 
+    # Imported here: only init needs the live display and the network stack
+    from rich.live import Live
+    from forge.downloader import download_and_extract_template, copy_local_template
+
     # Track git error message outside Live context so it persists
     git_error_message = None
 
@@ -265,7 +293,10 @@ def init_command(
     ) as live:
         tracker.attach_refresh(lambda: live.update(tracker.render()))
         try:
-            if local_templates:
+            if bundle:
+                from forge.bundle import apply_bundle
+                apply_bundle(bundle, project_path, tracker=tracker)
+            elif local_templates:
                 copy_local_template(
                     project_path,
                     selected_ai,
@@ -275,9 +306,7 @@ def init_command(
                     debug=debug,
                 )
             else:
-                verify = not skip_tls
-                local_ssl_context = ssl_context if verify else False
-                local_client = httpx.Client(verify=local_ssl_context)
+                local_client = get_client(verify=not skip_tls)
 
                 download_and_extract_template(
                     project_path,
@@ -289,6 +318,7 @@ def init_command(
                     client=local_client,
                     debug=debug,
                     github_token=github_token,
+                    pipelined=pipeline,
                 )
 
             ensure_executable_scripts(project_path, tracker=tracker)
@@ -296,11 +326,12 @@ def init_command(
             # Initialize State
             tracker.start("state")
             try:
-                # Temporarily change CWD to project_path to save state
-                original_cwd_state = Path.cwd()
-                os.chdir(project_path)
-                save_state(FeatureState(name=project_name or project_path.name or "Project"))
-                os.chdir(original_cwd_state)
+                # Write into the new project's .forge explicitly: root discovery from
+                # the current directory could find an enclosing project instead.
+                StateStore(project_path / FORGE_DIR).save(
+                    FeatureState(name=project_name or project_path.name or "Project")
+                )
+                clear_project_root_cache()
                 tracker.complete("state")
             except Exception as e:
                 tracker.error("state", str(e))
@@ -0,0 +1,31 @@
+import typer
+from pathlib import Path
+from typing import Optional
+from forge.daemon import get_socket_path, serve, stop
+from forge.utils import console
+
+def serve_command(
+    socket: Optional[Path] = typer.Option(None, "--socket", help="Unix socket to listen on (default: $FORGE_SOCKET or a per-user runtime file)"),
+    stop_daemon: bool = typer.Option(False, "--stop", help="Stop the daemon listening on the socket"),
+):
+    """
+    Run a daemon that answers forge commands without per-call startup cost.
+
+    While it runs, plan, tasks, implement, optimize, rules and state are
+    forwarded to it from any shell. Set FORGE_NO_DAEMON to bypass it.
+    """
+    path = socket or get_socket_path()
+    if stop_daemon:
+        if not stop(path):
+            console.print(f"[yellow]No forge daemon is listening on {path}[/yellow]")
+            raise typer.Exit(1)
+        console.print(f"[green]Stopped the forge daemon on {path}[/green]")
+        return
+    console.print(f"[cyan]forge daemon listening on {path}[/cyan] (Ctrl+C to stop)")
+    try:
+        serve(path)
+    except FileExistsError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    except KeyboardInterrupt:
+        pass
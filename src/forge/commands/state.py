@@ -0,0 +1,131 @@
+import os
+import typer
+from enum import Enum
+from typing import List, Optional
+from rich.table import Table
+from forge.models import Status, Task
+from forge.state import (
+    feature_exists,
+    get_feature_path,
+    load_feature_index,
+    load_state,
+    migrate_state,
+    record_quality_gate,
+    update_task,
+)
+from forge.utils import console
+
+state_app = typer.Typer(help="Inspect and update workflow state")
+
+class Backend(str, Enum):
+    JSON = "json"
+    SQLITE = "sqlite"
+
+def check_feature(feature: Optional[str]) -> None:
+    """Exit with an error if the feature named by --feature or FORGE_FEATURE has not been planned yet."""
+    feature = feature or os.getenv("FORGE_FEATURE") or None
+    if feature and not feature_exists(feature):
+        console.print(f"[red]Unknown feature '{feature}'.[/red] Run 'forge plan {feature}' first.")
+        raise typer.Exit(1)
+
+def print_tasks(tasks: List[Task], title: str = "Tasks") -> None:
+    """Print tasks as a table."""
+    table = Table(title=title)
+    table.add_column("ID")
+    table.add_column("Status")
+    table.add_column("Description")
+    table.add_column("File")
+    for task in tasks:
+        table.add_row(task.id, task.status.value, task.description, task.file_path or "")
+    console.print(table)
+
+@state_app.command("show")
+def show(
+    feature: Optional[str] = typer.Option(None, "--feature", "-f", help="Feature to use (default: the active one)"),
+):
+    """
+    Show the current phase, tasks and quality gates.
+    """
+    check_feature(feature)
+    state = load_state(feature)
+    console.print(
+        f"[bold]{state.name}[/bold]  phase=[cyan]{state.phase.value}[/cyan]  status=[cyan]{state.status.value}[/cyan]"
+    )
+
+    if state.tasks:
+        print_tasks(state.tasks)
+
+    if state.quality_gates:
+        table = Table(title="Quality Gates")
+        table.add_column("Gate")
+        table.add_column("Result")
+        table.add_column("When")
+        table.add_column("Details")
+        for gate in state.quality_gates:
+            result = "[green]passed[/green]" if gate.passed else "[red]failed[/red]"
+            table.add_row(gate.name, result, gate.timestamp, gate.details or "")
+        console.print(table)
+
+@state_app.command("task")
+def task(
+    task_id: str = typer.Argument(..., help="Task ID, e.g. T1"),
+    status: Optional[Status] = typer.Option(None, "--status", "-s", help="New task status"),
+    description: Optional[str] = typer.Option(None, "--description", "-d", help="Task description"),
+    file_path: Optional[str] = typer.Option(None, "--file", help="File the task changes"),
+    test_file: Optional[str] = typer.Option(None, "--test-file", help="Test covering the task"),
+    feature: Optional[str] = typer.Option(None, "--feature", "-f", help="Feature to use (default: the active one)"),
+):
+    """
+    Create or update a single task without rewriting the whole state.
+    """
+    fields = {
+        "status": status,
+        "description": description,
+        "file_path": file_path,
+        "test_file": test_file,
+    }
+    fields = {name: value for name, value in fields.items() if value is not None}
+    check_feature(feature)
+    update_task(task_id, feature, **fields)
+    changes = ", ".join(f"{name}={getattr(value, 'value', value)}" for name, value in fields.items())
+    console.print(f"[green]✓[/green] Task {task_id} updated" + (f" ({changes})" if changes else ""))
+
+@state_app.command("gate")
+def gate(
+    name: str = typer.Argument(..., help="Quality gate name, e.g. tests"),
+    passed: bool = typer.Option(..., "--passed/--failed", help="Gate result"),
+    details: Optional[str] = typer.Option(None, "--details", help="Free-form result details"),
+    feature: Optional[str] = typer.Option(None, "--feature", "-f", help="Feature to use (default: the active one)"),
+):
+    """
+    Record a quality gate result.
+    """
+    check_feature(feature)
+    record_quality_gate(name, passed, details, feature)
+    result = "[green]passed[/green]" if passed else "[red]failed[/red]"
+    console.print(f"Gate {name}: {result}")
+
+@state_app.command("migrate")
+def migrate(
+    backend: Backend = typer.Argument(..., help="Storage backend to move the state to"),
+    feature: Optional[str] = typer.Option(None, "--feature", "-f", help="Feature to use (default: the active one)"),
+):
+    """
+    Move the project state between state.json and a SQLite database (state.db).
+    """
+    check_feature(feature)
+    path = migrate_state(backend.value, get_feature_path(feature))
+    console.print(f"[green]✓[/green] State stored in {path}")
+
+@state_app.command("features")
+def features():
+    """
+    List the features of this project.
+    """
+    index = load_feature_index()
+    if not index["features"]:
+        console.print("[dim]No features yet. Run 'forge plan <feature>' to start one.[/dim]")
+        return
+    for slug, info in index["features"].items():
+        marker = "[green]*[/green]" if slug == index["active"] else " "
+        console.print(f"{marker} {slug}  [dim]{info.get('name', slug)}[/dim]")
@@ -1,114 +1,150 @@
+import json
+import os
 import typer
 from pathlib import Path
 from datetime import datetime
-from typing import List
-from rich.markdown import Markdown
-from forge.state import update_phase, load_state, Phase, save_state
+from typing import List, Optional
+from forge.state import activate_feature, update_phase, update_state, query_tasks, Phase
+from forge.models import Status
 from forge.utils import console
+from forge.cache import CompileCache, Dependencies
 from forge.compiler.markdown import process_template
+from forge.project import FORGE_DIR, find_project_root
+from forge.commands.state import check_feature, print_tasks
 
 workflow_app = typer.Typer(help="Workflow management commands")
 
+def print_markdown(text: str) -> None:
+    """Render markdown to the console (rich.markdown is only imported when needed)."""
+    from rich.markdown import Markdown
+    console.print(Markdown(text))
+
+# Template subdirectories searched for embeds, in priority order
+TEMPLATE_DIRS = ("blocks", "instructions", "personas", "agents", "workflows")
+
+def _template_subdirs(base: Path) -> List[Path]:
+    """The TEMPLATE_DIRS that exist under base, from a single directory listing."""
+    try:
+        with os.scandir(base) as entries:
+            present = {entry.name for entry in entries if entry.is_dir()}
+    except OSError:
+        return []
+    return [base / name for name in TEMPLATE_DIRS if name in present]
+
 def get_search_paths() -> List[Path]:
     """Get search paths for template resolution."""
-    paths = []
-
+    root = find_project_root()
     # Priority 1: .forge/templates (User Customizations)
-    base_local = Path.cwd() / ".forge" / "templates"
-    paths.extend([
-        base_local / "blocks",
-        base_local / "instructions",
-        base_local / "personas",
-        base_local / "agents",
-        base_local / "workflows",
-    ])
-
     # Priority 2: Repo root templates (Dev environment)
-    base_repo = Path.cwd() / "templates"
-    paths.extend([
-        base_repo / "blocks",
-        base_repo / "instructions",
-        base_repo / "personas",
-        base_repo / "agents",
-        base_repo / "workflows",
-    ])
-
-    # Filter only existing paths
-    return [p for p in paths if p.exists()]
+    return _template_subdirs(root / FORGE_DIR / "templates") + _template_subdirs(root / "templates")
 
 def load_agent_template(agent_name: str) -> str:
     """Load agent template and resolve wikilinks/embeds."""
-    content = ""
-
+    root = find_project_root()
     # Priority 1: User customized template in .forge/templates/agents
-    local_template = Path.cwd() / ".forge" / "templates" / "agents" / f"{agent_name}.md"
-    if local_template.exists():
-        content = local_template.read_text(encoding="utf-8")
-    else:
+    template_path = root / FORGE_DIR / "templates" / "agents" / f"{agent_name}.md"
+    if not template_path.exists():
         # Priority 2: Dev environment (repo root)
-        repo_template = Path.cwd() / "templates" / "agents" / f"{agent_name}.md"
-        if repo_template.exists():
-            content = repo_template.read_text(encoding="utf-8")
-        else:
+        template_path = root / "templates" / "agents" / f"{agent_name}.md"
+        if not template_path.exists():
             return f"Error: Template for agent '{agent_name}' not found."
 
+    search_paths = get_search_paths()
+    cache = CompileCache()
+    key = json.dumps(["agent", str(template_path), [str(p) for p in search_paths]])
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Search directories are dependencies too: adding an override changes resolution.
+    dependencies = Dependencies([template_path, *search_paths])
+    content = template_path.read_text(encoding="utf-8")
+
     # Process template
-    return process_template(content, get_search_paths())
+    compiled = process_template(content, search_paths, dependencies=dependencies)
+    cache.put(key, compiled, dependencies)
+    return compiled
 
 @workflow_app.command("plan")
 def plan(feature: str = typer.Argument(None, help="Feature name or slug")):
     """
     Start the Planning Phase. Generates docs/01-plan.md.
+
+    Naming a feature creates it (or switches to it) and makes it the active feature.
     """
     console.print("[bold blue]Starting Planning Phase[/bold blue]")
 
-    state = load_state()
     if feature:
-        state.name = feature
+        # Each feature has its own state shard; planning one makes it the active feature
+        activate_feature(feature)
+    else:
+        check_feature(None)
 
-    state.phase = Phase.PLAN
-    state.updated_at = datetime.now().isoformat()
-    save_state(state)
+    def start_planning(state):
+        if feature:
+            state.name = feature
+        state.phase = Phase.PLAN
+        state.updated_at = datetime.now().isoformat()
+
+    # Retries instead of overwriting if a worker records a task meanwhile
+    update_state(start_planning, feature)
 
     template = load_agent_template("plan")
-    console.print(Markdown(template))
+    print_markdown(template)
     console.print("\n[bold green]State updated to PLAN. Copy the prompt above to your AI agent.[/bold green]")
 
 @workflow_app.command("tasks")
-def tasks():
+def tasks(
+    feature: Optional[str] = typer.Option(None, "--feature", "-f", help="Feature to work on (default: the active one)"),
+    status: Optional[Status] = typer.Option(None, "--status", help="List tasks with this status instead"),
+    file_path: Optional[str] = typer.Option(None, "--file", help="List tasks touching this file instead"),
+):
     """
     Start the Task Breakdown Phase. Generates docs/02-tasks.md.
+
+    With --status or --file, list matching tasks and leave the phase unchanged.
     """
+    check_feature(feature)
+    if status is not None or file_path is not None:
+        print_tasks(query_tasks(status=status, file_path=file_path, feature=feature))
+        return
+
     console.print("[bold blue]Starting Task Breakdown Phase[/bold blue]")
 
-    update_phase(Phase.TASKS)
+    update_phase(Phase.TASKS, feature)
 
     template = load_agent_template("tasks")
-    console.print(Markdown(template))
+    print_markdown(template)
     console.print("\n[bold green]State updated to TASKS. Copy the prompt above to your AI agent.[/bold green]")
 
 @workflow_app.command("implement")
-def implement():
+def implement(
+    feature: Optional[str] = typer.Option(None, "--feature", "-f", help="Feature to work on (default: the active one)"),
+):
     """
     Start the Implementation Phase. Spawns workers for tasks.
     """
     console.print("[bold blue]Starting Implementation Phase[/bold blue]")
 
-    update_phase(Phase.IMPLEMENT)
+    check_feature(feature)
+    update_phase(Phase.IMPLEMENT, feature)
 
     template = load_agent_template("implement") # or worker.md
-    console.print(Markdown(template))
+    print_markdown(template)
     console.print("\n[bold green]State updated to IMPLEMENT. Copy the prompt above to your AI agent.[/bold green]")
 
 @workflow_app.command("optimize")
-def optimize():
+def optimize(
+    feature: Optional[str] = typer.Option(None, "--feature", "-f", help="Feature to work on (default: the active one)"),
+):
     """
     Start the Optimization Phase. Runs quality gates.
     """
     console.print("[bold blue]Starting Optimization Phase[/bold blue]")
 
-    update_phase(Phase.OPTIMIZE)
+    check_feature(feature)
+    update_phase(Phase.OPTIMIZE, feature)
 
     template = load_agent_template("optimize")
-    console.print(Markdown(template))
+    print_markdown(template)
     console.print("\n[bold green]State updated to OPTIMIZE. Copy the prompt above to your AI agent.[/bold green]")
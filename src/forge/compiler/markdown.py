@@ -1,19 +1,82 @@
-import re
+import hashlib
+import os
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
+from forge.cache import Stamp, stat_stamp
+from forge.project import find_project_root
+
+RECURSION_ERROR = "\n<!-- Error: Recursion depth exceeded -->"
+
+# Frontmatter longer than this is not looked for: a stray opening fence must
+# not make us scan (and strip) a large file up to a horizontal rule.
+MAX_FRONTMATTER_LINES = 256
+
+@dataclass
+class Frontmatter:
+    """Frontmatter metadata and the offset where the markdown body starts."""
+    metadata: Dict[str, str]
+    body_offset: int
+
+NO_FRONTMATTER = Frontmatter({}, 0)
+
+def _parse_metadata(lines: List[str]) -> Dict[str, str]:
+    # Flat "key: value" pairs only; nested YAML and comments are skipped.
+    metadata = {}
+    for line in lines:
+        if not line or line[0] in " \t#-" or ":" not in line:
+            continue
+        key, _, value = line.partition(":")
+        value = value.strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+            value = value[1:-1]
+        metadata[key.strip()] = value
+    return metadata
+
+def parse_frontmatter(content: str) -> Frontmatter:
+    """
+    Split YAML frontmatter (--- ... ---) off the top of content.
+
+    The closing fence is found by scanning at most MAX_FRONTMATTER_LINES lines.
+    Blank lines right after it belong to the frontmatter, as before.
+    """
+    if not content.startswith("---"):
+        return NO_FRONTMATTER
+    end = content.find("\n")
+    if end == -1 or content[3:end].strip():
+        return NO_FRONTMATTER
+
+    lines = []
+    pos = end + 1
+    for _ in range(MAX_FRONTMATTER_LINES):
+        if pos >= len(content):
+            break
+        end = content.find("\n", pos)
+        if end == -1:
+            end = len(content)
+        line = content[pos:end]
+        if line.rstrip() == "---":
+            body = end + 1
+            while body < len(content):
+                blank_end = content.find("\n", body)
+                if blank_end == -1 or content[body:blank_end].strip():
+                    break
+                body = blank_end + 1
+            return Frontmatter(_parse_metadata(lines), min(body, len(content)))
+        lines.append(line.rstrip())
+        pos = end + 1
+    return NO_FRONTMATTER
 
 def strip_frontmatter(content: str) -> str:
     """Remove YAML frontmatter from content."""
-    # Match start of file --- ... ---
-    # DOTALL to match newlines
-    if content.startswith("---"):
-        pattern = r'^---\s*\n.*?\n---\s*\n'
-        return re.sub(pattern, '', content, flags=re.DOTALL)
-    return content
+    return content[parse_frontmatter(content).body_offset:]
+
+def _template_name(filename: str) -> str:
+    return filename if filename.endswith(".md") else f"{filename}.md"
 
 def find_file_in_paths(filename: str, search_paths: List[Path]) -> Optional[Path]:
     """Find a file (with .md extension if missing) in search paths."""
-    name = filename if filename.endswith(".md") else f"{filename}.md"
+    name = _template_name(filename)
 
     for path in search_paths:
         candidate = path / name
@@ -21,50 +84,340 @@ def find_file_in_paths(filename: str, search_paths: List[Path]) -> Optional[Path
             return candidate
     return None
 
-def process_template(content: str, search_paths: List[Path], depth: int = 0, max_depth: int = 10) -> str:
+class SearchPathIndex:
     """
-    Process markdown template:
-    1. Resolve transclusions ![[...]] recursively.
-    2. Resolve wikilinks [[...]] to paths.
+    In-memory name -> path map over a list of search paths.
+
+    Each directory is listed once up front; earlier search paths win, matching
+    find_file_in_paths. Lookups then cost a dict access instead of a stat per
+    search path, which matters on network filesystems.
     """
-    if depth > max_depth:
-        return content + "\n<!-- Error: Recursion depth exceeded -->"
-
-    # 1. Resolve Transclusions ![[filename]]
-    def replace_transclusion(match):
-        ref = match.group(1).strip()
-        found_path = find_file_in_paths(ref, search_paths)
-        if found_path:
-            file_content = found_path.read_text(encoding="utf-8")
-            # Strip frontmatter from the INCLUDED file
-            stripped_content = strip_frontmatter(file_content)
-            # Recursively process the included content
-            return process_template(stripped_content, search_paths, depth + 1, max_depth)
-        else:
-            return f"<!-- Error: Transclusion not found: {ref} -->"
-
-    # Regex for ![[...]]
-    # Non-greedy match for content inside brackets
-    content = re.sub(r'!\[\[(.*?)\]\]', replace_transclusion, content)
-
-    # 2. Resolve WikiLinks [[filename]]
-    # Replace with @path/to/filename.md (relative to CWD or absolute? Claude Code likes relative)
-    # We should probably resolve to a relative path from the project root if possible.
-    def replace_wikilink(match):
-        ref = match.group(1).strip()
-        found_path = find_file_in_paths(ref, search_paths)
-        if found_path:
-            # Try to make relative to CWD
+
+    def __init__(self, search_paths: List[Path]):
+        self.search_paths = list(search_paths)
+        self._names: Dict[str, Path] = {}
+        # Names with a directory part are probed on first use and remembered.
+        self._nested: Dict[str, Optional[Path]] = {}
+        for path in self.search_paths:
             try:
-                rel_path = found_path.resolve().relative_to(Path.cwd().resolve())
-                return f"@{rel_path}"
-            except ValueError:
-                return f"@{found_path}"
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.name not in self._names and entry.is_file():
+                            self._names[entry.name] = path / entry.name
+            except OSError:
+                continue
+
+    def find(self, filename: str) -> Optional[Path]:
+        """Find a file (with .md extension if missing) in the indexed paths."""
+        name = _template_name(filename)
+        if "/" not in name and os.sep not in name:
+            return self._names.get(name)
+        if name not in self._nested:
+            self._nested[name] = find_file_in_paths(name, self.search_paths)
+        return self._nested[name]
+
+@dataclass(frozen=True)
+class TextNode:
+    """Literal markdown copied to the output as-is."""
+    text: str
+
+@dataclass(frozen=True)
+class TransclusionNode:
+    """An embed ![[ref]] replaced by the expanded content of the target file."""
+    ref: str
+    raw: str
+
+@dataclass(frozen=True)
+class WikiLinkNode:
+    """A link [[ref]] rewritten to an @path reference."""
+    ref: str
+
+Node = Union[TextNode, TransclusionNode, WikiLinkNode]
+
+def parse_template(content: str) -> List[Node]:
+    """
+    Parse markdown into text, transclusion and wikilink nodes in one pass.
+
+    A link is `[[` up to the first `]]` on the same line; a `!` right before it
+    makes it a transclusion. As with the former two-pass regex approach,
+    transclusions win: a wikilink candidate enclosing a `![[` is skipped so the
+    transclusion inside it is matched instead. Positions of the next `]]`,
+    newline and `![[` are reused across candidates, so the scan stays linear
+    even on malformed input.
+    """
+    nodes: List[Node] = []
+    text_start = pos = 0
+    close = newline = inner_embed = -1
+    while True:
+        start = content.find("[[", pos)
+        if start == -1:
+            break
+        if close < start + 2:
+            close = content.find("]]", start + 2)
+            if close == -1:
+                break
+        if newline < start + 2:
+            newline = content.find("\n", start + 2)
+            if newline == -1:
+                newline = len(content)
+        if newline < close:
+            # Brackets never span lines; retry from the next character
+            pos = start + 1
+            continue
+
+        embed = start > 0 and content[start - 1] == "!"
+        if not embed:
+            if inner_embed < start + 2:
+                inner_embed = content.find("![[", start + 2)
+                if inner_embed == -1:
+                    inner_embed = len(content)
+            if inner_embed < close:
+                pos = start + 1
+                continue
+        link_start = start - 1 if embed else start
+        if link_start > text_start:
+            nodes.append(TextNode(content[text_start:link_start]))
+        ref = content[start + 2:close].strip()
+        pos = text_start = close + 2
+        if embed:
+            nodes.append(TransclusionNode(ref, content[link_start:pos]))
         else:
-            return f"[[{ref}]]" # Keep original if not found
+            nodes.append(WikiLinkNode(ref))
+
+    if text_start < len(content):
+        nodes.append(TextNode(content[text_start:]))
+    return nodes
 
-    # Regex for [[...]] but NOT ![[...]]
-    # Using negative lookbehind (?<!!) is tricky if ! is separated by space, but usually it is ![[
-    content = re.sub(r'(?<!\!)\[\[(.*?)\]\]', replace_wikilink, content)
+@dataclass
+class ParsedTemplate:
+    """A template file read, frontmatter-stripped and parsed exactly once."""
+    path: Path
+    digest: str
+    body: str
+    nodes: List[Node]
+    metadata: Dict[str, str]
 
-    return content
+@dataclass
+class _Expansion:
+    text: str
+    # How many transclusion levels the expansion descends below the file itself.
+    # A memoized expansion is only reusable where those levels fit under max_depth.
+    levels: int
+    # Every file read to produce the expansion, the template itself included.
+    dependencies: FrozenSet[Path]
+
+@dataclass
+class _RenderState:
+    """Mutable state of one render call, shared down the include tree."""
+    max_depth: int
+    # Output chunks, joined once at the end
+    out: List[str] = field(default_factory=list)
+    # Files read so far; a subtree's dependencies are a slice of this list
+    deps: List[Path] = field(default_factory=list)
+    # Files currently being expanded, outermost first
+    stack: List[Path] = field(default_factory=list)
+
+class TemplateEngine:
+    """
+    Expand templates against a fixed set of search paths.
+
+    Every file is parsed once into a node graph, and its fully expanded output
+    is memoized by content hash, so a block included from many places is read
+    and expanded once per engine rather than once per include. Include cycles
+    are detected from the current include stack and reported with their path
+    instead of being expanded until max_depth.
+    """
+
+    def __init__(self, search_paths: List[Path], root: Optional[Path] = None):
+        self.search_paths = list(search_paths)
+        # Stamp of every search path and template read, checked by is_stale()
+        # and handed out with dependencies; taken before reading so a
+        # concurrent edit is never missed
+        self._stamps: Dict[Path, Stamp] = {path: stat_stamp(path) for path in self.search_paths}
+        self.index = SearchPathIndex(self.search_paths)
+        self.root = (root or Path.cwd()).resolve()
+        self._templates: Dict[Path, ParsedTemplate] = {}
+        self._expanded: Dict[str, _Expansion] = {}
+        self._links: Dict[str, str] = {}
+
+    def load(self, path: Path) -> ParsedTemplate:
+        """Return the parsed template for path, reading it on first use only."""
+        template = self._templates.get(path)
+        if template is None:
+            self._stamps[path] = stat_stamp(path)
+            template = self._templates[path] = self._parse(path, path.read_text(encoding="utf-8"))
+        return template
+
+    def preload(self, sources: Mapping[Path, str], stamps: Optional[Mapping[Path, Stamp]] = None) -> None:
+        """Seed the template cache with already-read file contents.
+
+        stamps holds each file's stamp from before it was read; files without
+        one are stamped now.
+        """
+        for path, source in sources.items():
+            if path not in self._templates:
+                self._stamps[path] = stamps[path] if stamps and path in stamps else stat_stamp(path)
+                self._templates[path] = self._parse(path, source)
+
+    def stamp(self, path: Path) -> Stamp:
+        """The stamp of path from when this engine read it, else its current one."""
+        return self._stamps[path] if path in self._stamps else stat_stamp(path)
+
+    def is_stale(self) -> bool:
+        """True if a template or search path changed on disk since it was read."""
+        return any(stat_stamp(path) != stamp for path, stamp in self._stamps.items())
+
+    @staticmethod
+    def _parse(path: Path, source: str) -> ParsedTemplate:
+        # Strip frontmatter from the INCLUDED file
+        frontmatter = parse_frontmatter(source)
+        body = source[frontmatter.body_offset:]
+        return ParsedTemplate(
+            path=path,
+            digest=hashlib.sha256(source.encode("utf-8")).hexdigest(),
+            body=body,
+            nodes=parse_template(body),
+            metadata=frontmatter.metadata,
+        )
+
+    def render(
+        self,
+        content: str,
+        depth: int = 0,
+        max_depth: int = 10,
+        dependencies: Optional[Dict[Path, Stamp]] = None,
+    ) -> str:
+        """Expand transclusions and wikilinks in content.
+
+        If dependencies is given, every transcluded file is added to it with
+        its stamp from when it was read.
+        """
+        if depth > max_depth:
+            return content + RECURSION_ERROR
+        state = _RenderState(max_depth)
+        self._render_nodes(parse_template(content), depth, state)
+        if dependencies is not None:
+            for path in state.deps:
+                dependencies.setdefault(path, self._stamps[path])
+        return "".join(state.out)
+
+    def _render_nodes(self, nodes: List[Node], depth: int, state: _RenderState) -> Optional[int]:
+        """Append rendered nodes to the output; returns levels, or None if the result is context-dependent."""
+        levels: Optional[int] = 0
+        for node in nodes:
+            if isinstance(node, TextNode):
+                state.out.append(node.text)
+            elif isinstance(node, WikiLinkNode):
+                state.out.append(self._render_wikilink(node.ref))
+            else:
+                child_levels = self._render_transclusion(node.ref, depth + 1, state)
+                if levels is not None:
+                    levels = None if child_levels is None else max(levels, child_levels)
+        return levels
+
+    def _render_transclusion(self, ref: str, depth: int, state: _RenderState) -> Optional[int]:
+        found_path = self.index.find(ref)
+        if not found_path:
+            state.out.append(f"<!-- Error: Transclusion not found: {ref} -->")
+            return 0
+
+        if found_path in state.stack:
+            cycle = state.stack[state.stack.index(found_path):] + [found_path]
+            state.out.append(
+                f"<!-- Error: Transclusion cycle detected: {' -> '.join(self._display(p) for p in cycle)} -->"
+            )
+            # The message depends on the include path, so enclosing expansions are not memoized
+            return None
+
+        template = self.load(found_path)
+        state.deps.append(template.path)
+        cached = self._expanded.get(template.digest)
+        if cached is not None and depth + cached.levels <= state.max_depth:
+            state.deps.extend(cached.dependencies)
+            state.out.append(cached.text)
+            return cached.levels + 1
+
+        if depth > state.max_depth:
+            # Leave nested embeds untouched but still resolve plain wikilinks,
+            # as the enclosing wikilink pass always did for truncated content.
+            for node in template.nodes:
+                if isinstance(node, TransclusionNode):
+                    state.out.append(node.raw)
+                elif isinstance(node, WikiLinkNode):
+                    state.out.append(self._render_wikilink(node.ref))
+                else:
+                    state.out.append(node.text)
+            state.out.append(RECURSION_ERROR)
+            return None
+
+        out_start, deps_start = len(state.out), len(state.deps) - 1
+        state.stack.append(found_path)
+        try:
+            levels = self._render_nodes(template.nodes, depth, state)
+        finally:
+            state.stack.pop()
+        if levels is None:
+            return None
+        # Memoize only context-free expansions: reused verbatim wherever the file is included again
+        self._expanded[template.digest] = _Expansion(
+            "".join(state.out[out_start:]), levels, frozenset(state.deps[deps_start:])
+        )
+        return levels + 1
+
+    def _display(self, path: Path) -> str:
+        try:
+            return str(path.resolve().relative_to(self.root))
+        except ValueError:
+            return str(path)
+
+    def _render_wikilink(self, ref: str) -> str:
+        # Replace with @path/to/filename.md (relative to CWD or absolute? Claude Code likes relative)
+        # We should probably resolve to a relative path from the project root if possible.
+        rendered = self._links.get(ref)
+        if rendered is None:
+            found_path = self.index.find(ref)
+            if found_path:
+                # Relative to CWD when possible
+                rendered = f"@{self._display(found_path)}"
+            else:
+                rendered = f"[[{ref}]]" # Keep original if not found
+            self._links[ref] = rendered
+        return rendered
+
+_engines: Dict[Tuple[Tuple[Path, ...], Path], TemplateEngine] = {}
+
+def get_engine(search_paths: List[Path]) -> TemplateEngine:
+    """Return the process-wide engine for these search paths and project root."""
+    root = find_project_root()
+    key = (tuple(search_paths), root)
+    engine = _engines.get(key)
+    if engine is None:
+        engine = _engines[key] = TemplateEngine(search_paths, root)
+    return engine
+
+def clear_template_cache() -> None:
+    """Drop all engines, forcing templates to be re-read on the next compile."""
+    _engines.clear()
+
+def drop_stale_engines() -> None:
+    """Drop engines whose templates changed on disk; for long-running processes."""
+    for key, engine in list(_engines.items()):
+        if engine.is_stale():
+            del _engines[key]
+
+def process_template(
+    content: str,
+    search_paths: List[Path],
+    depth: int = 0,
+    max_depth: int = 10,
+    dependencies: Optional[Dict[Path, Stamp]] = None,
+) -> str:
+    """
+    Process markdown template:
+    1. Resolve transclusions ![[...]] recursively.
+    2. Resolve wikilinks [[...]] to paths.
+
+    Paths of all transcluded files are added to dependencies, with their
+    stamps from when they were read, when provided.
+    """
+    return get_engine(search_paths).render(content, depth, max_depth, dependencies)
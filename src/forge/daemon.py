@@ -0,0 +1,259 @@
+import json
+import os
+import socket
+import stat
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# `forge serve` runs CLI commands in one long-lived process so that repeated
+# calls skip interpreter startup and imports and reuse parsed templates and
+# state. The client half of this module runs on every `forge` invocation and
+# must only import the standard library.
+
+# Only commands that neither prompt nor draw live progress are forwarded
+FORWARDED_COMMANDS = frozenset({"plan", "tasks", "implement", "optimize", "rules", "state"})
+
+# Set to any value to always run commands in-process
+NO_DAEMON_ENV = "FORGE_NO_DAEMON"
+
+# Overrides the default socket location
+SOCKET_ENV = "FORGE_SOCKET"
+
+# Client environment variables applied to the forwarded command
+ENV_PREFIX = "FORGE_"
+
+# Seconds to wait for the daemon to accept a connection
+CONNECT_TIMEOUT = 1.0
+# Seconds to wait for a command's reply before giving up on it; override
+# with FORGE_DAEMON_TIMEOUT
+REPLY_TIMEOUT = 30.0
+
+def get_socket_path() -> Path:
+    """Socket the daemon listens on: $FORGE_SOCKET, else a per-user file in the runtime or temp dir."""
+    configured = os.environ.get(SOCKET_ENV)
+    if configured:
+        return Path(configured)
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if not base:
+        import tempfile
+        base = tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return Path(base) / f"forge-{user}.sock"
+
+def _reply_timeout() -> float:
+    try:
+        return float(os.environ.get("FORGE_DAEMON_TIMEOUT", ""))
+    except ValueError:
+        return REPLY_TIMEOUT
+
+def _is_own_socket(path: Path) -> bool:
+    """True if path is a socket of this user that no one else can connect to.
+
+    The temp dir fallback is shared by all users, so anyone could have
+    created the socket first and would then receive our arguments and
+    environment and choose our output.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(st.st_mode) or stat.S_IMODE(st.st_mode) & 0o077:
+        return False
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+def _connect(path: Path) -> Optional[socket.socket]:
+    if not hasattr(socket, "AF_UNIX") or not _is_own_socket(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(CONNECT_TIMEOUT)
+    try:
+        sock.connect(str(path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+def _send(sock: socket.socket, message: Dict[str, Any]) -> bool:
+    """Send one request line; False if it could not be delivered."""
+    sock.settimeout(_reply_timeout())
+    try:
+        sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+    except OSError:
+        return False
+    return True
+
+def _receive(sock: socket.socket) -> Optional[Dict[str, Any]]:
+    """Read the reply; None if there is none within the reply timeout."""
+    chunks = []
+    try:
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    except OSError:
+        return None
+    try:
+        return json.loads(b"".join(chunks))
+    except ValueError:
+        return None
+
+def _exchange(sock: socket.socket, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    with sock:
+        return _receive(sock) if _send(sock, message) else None
+
+def forward(argv: List[str], socket_path: Optional[Path] = None) -> Optional[int]:
+    """Run argv in a running daemon and return its exit code.
+
+    Returns None when the command should run in-process instead: forwarding is
+    disabled, the command is not forwardable, or no daemon of this user
+    accepts the request. Once the request is delivered the daemon will run
+    it, so a missing reply is an error rather than a reason to run it again.
+    """
+    if os.environ.get(NO_DAEMON_ENV) or not argv or argv[0] not in FORWARDED_COMMANDS:
+        return None
+    sock = _connect(socket_path or get_socket_path())
+    if sock is None:
+        return None
+    tty = sys.stdout.isatty()
+    with sock:
+        if not _send(sock, {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "env": {key: value for key, value in os.environ.items() if key.startswith(ENV_PREFIX)},
+            "tty": tty,
+            "columns": os.get_terminal_size().columns if tty else None,
+        }):
+            return None
+        reply = _receive(sock)
+    if reply is None:
+        sys.stderr.write(
+            "forge: no answer from the daemon in time; the command may still complete there "
+            "(see FORGE_DAEMON_TIMEOUT)\n"
+        )
+        return 1
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    sys.stdout.flush()
+    return reply["exit_code"]
+
+def is_running(socket_path: Optional[Path] = None) -> bool:
+    """True if a daemon accepts connections on the socket."""
+    sock = _connect(socket_path or get_socket_path())
+    if sock is None:
+        return False
+    sock.close()
+    return True
+
+def stop(socket_path: Optional[Path] = None) -> bool:
+    """Ask a running daemon to exit after the current request; False if none is running."""
+    sock = _connect(socket_path or get_socket_path())
+    if sock is None:
+        return False
+    _exchange(sock, {"shutdown": True})
+    return True
+
+# Server side. Everything below runs in the daemon only and may import freely.
+
+def _invoke(argv: List[str]) -> int:
+    import traceback
+    import click
+    import typer
+    from forge.cli import app
+
+    try:
+        result = typer.main.get_command(app).main(args=argv, prog_name="forge", standalone_mode=False)
+    except click.exceptions.Exit as e:
+        return e.exit_code
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except click.exceptions.Abort:
+        sys.stderr.write("Aborted!\n")
+        return 1
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    except Exception:
+        traceback.print_exc()
+        return 1
+    # Without standalone mode click returns the exit code of typer.Exit
+    return result if isinstance(result, int) else 0
+
+def _refresh_caches() -> None:
+    """Forget in-memory state that files on disk may have invalidated."""
+    from forge.compiler.markdown import drop_stale_engines
+    from forge.project import clear_project_root_cache
+
+    # Cheap to rediscover, and a .forge may have been created since
+    clear_project_root_cache()
+    drop_stale_engines()
+    # Parsed state.json snapshots are validated by their own stat stamp
+
+def run_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one forwarded command in this process as if launched from the client."""
+    import io
+    from contextlib import redirect_stderr, redirect_stdout
+    from forge.utils import console
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    saved_cwd, saved_argv = os.getcwd(), sys.argv
+    saved_env = {key: value for key, value in os.environ.items() if key.startswith(ENV_PREFIX)}
+    try:
+        os.chdir(request["cwd"])
+        for key in saved_env:
+            del os.environ[key]
+        os.environ.update(request.get("env", {}))
+        # The banner callback inspects sys.argv for --help
+        sys.argv = ["forge", *request["argv"]]
+        console.no_color = not request.get("tty", False)
+        console.width = request.get("columns") or 80
+        _refresh_caches()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            exit_code = _invoke(request["argv"])
+    finally:
+        os.chdir(saved_cwd)
+        sys.argv = saved_argv
+        for key in [key for key in os.environ if key.startswith(ENV_PREFIX)]:
+            del os.environ[key]
+        os.environ.update(saved_env)
+    return {"exit_code": exit_code, "stdout": stdout.getvalue(), "stderr": stderr.getvalue()}
+
+def serve(socket_path: Optional[Path] = None) -> None:
+    """Serve forwarded commands on a Unix socket until stopped.
+
+    Requests are handled one at a time, since each changes the working
+    directory and redirects output for the whole process.
+    """
+    import socketserver
+
+    path = socket_path or get_socket_path()
+    if is_running(path):
+        raise FileExistsError(f"A forge daemon is already listening on {path}")
+    # Left behind by a daemon that was killed
+    path.unlink(missing_ok=True)
+    stopping = False
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            nonlocal stopping
+            request = json.loads(self.rfile.readline())
+            if request.get("shutdown"):
+                stopping = True
+                reply: Dict[str, Any] = {}
+            else:
+                reply = run_request(request)
+            self.wfile.write(json.dumps(reply).encode("utf-8"))
+
+    # Owner-only from the moment the socket exists
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(str(path), Handler)
+    finally:
+        os.umask(umask)
+    try:
+        while not stopping:
+            server.handle_request()
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
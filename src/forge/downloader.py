@@ -1,15 +1,43 @@
+import os
+import random
+import secrets
 import shutil
+import threading
+import time
 import zipfile
-import tempfile
 import httpx
 import typer
 from pathlib import Path
-from typing import Tuple
+from typing import Callable, List, Optional, Tuple
 
 from rich.panel import Panel
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
-from forge.utils import console, StepTracker, handle_vscode_settings, _github_auth_headers
+from forge.bundle import agent_template_dir, find_templates_root
+from forge.cache import ReleaseCache, cache_disabled, file_digest
+from forge.filesystem import atomic_writer
+from forge.http import get_client
+from forge.utils import console, StepTracker, handle_vscode_settings, merge_vscode_settings, _github_auth_headers
+
+# Copy buffer for streaming archive members to disk
+EXTRACT_CHUNK_SIZE = 1 << 20
+
+# Download read sizes scale with the archive between these bounds
+MIN_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 1 << 20
+
+# A failed download is retried this many times in total, resuming each time
+DOWNLOAD_ATTEMPTS = 5
+# Backoff before retry n is up to DOWNLOAD_BACKOFF * 2**n seconds, capped
+DOWNLOAD_BACKOFF = 1.0
+DOWNLOAD_BACKOFF_MAX = 30.0
+
+# Bytes fetched from the end of an archive to read its central directory
+# before the rest arrives (pipelined downloads only)
+PIPELINE_TAIL_BYTES = 64 * 1024
+
+# Signature of a ZIP's end of central directory record
+ZIP_END_SIGNATURE = b"PK\x05\x06"
 
 def copy_local_template(
     project_path: Path,
@@ -21,22 +49,9 @@ def copy_local_template(
     debug: bool = False,
 ) -> Path:
     """Copy templates from local source instead of downloading."""
-    # Find the root of the repo (assuming we are running from src/forge or similar)
-    # We need to find the 'templates' folder.
-    # If running installed, this might be harder, but this flag is for "self-hosting dev"
-    # so we assume we are in the repo.
-
-    # Try to find templates relative to the current working directory or the package location
-    potential_roots = [
-        Path.cwd(),
-        Path(__file__).parent.parent.parent, # If in src/forge/downloader.py, go up to root
-    ]
-
-    templates_root = None
-    for root in potential_roots:
-        if (root / "templates").is_dir():
-            templates_root = root / "templates"
-            break
+    # This flag is for "self-hosting dev", so we assume we are in the repo
+    # (or running from its checkout).
+    templates_root = find_templates_root()
 
     if not templates_root:
         msg = "Could not find 'templates' directory in current path or parent directories."
@@ -74,18 +89,11 @@ def copy_local_template(
 
         agent_folder_name = agent_config["folder"].strip("/") # e.g. ".cursor"
 
-        # Find the source folder for this agent in templates/
-        # It seems the repo structure is flat under templates/ for agents?
-        # Let's check if there is a directory that matches the agent folder name (without dot usually in source, or with dot?)
-        # Actually in AGENTS.md: `templates/[agent_dirs]/`.
-        # Let's assume the directory name in templates/ matches the target directory name (e.g. .cursor)
+        # The directory name in templates/ matches the target directory name,
+        # with or without the leading dot (e.g. .cursor or cursor)
+        agent_source = agent_template_dir(templates_root, ai_assistant)
 
-        agent_source = templates_root / agent_folder_name
-        if not agent_source.exists():
-            # Try without dot
-            agent_source = templates_root / agent_folder_name.lstrip(".")
-
-        if agent_source.exists():
+        if agent_source is not None:
              # We want to copy the CONTENTS of agent_source to project_path/agent_folder_name
              # Wait, usually the ZIP puts the .cursor folder IN the root.
              # So we copy agent_source TO project_path / agent_folder_name
@@ -133,6 +141,31 @@ def _merge_directory(src: Path, dst: Path, verbose: bool = False, tracker: StepT
                  shutil.copy2(item, dest_path)
 
 
+def _move_directory(src: Path, dst: Path, verbose: bool = False, tracker: StepTracker = None):
+    """Move the contents of src into dst, which must be on the same filesystem.
+
+    Files are renamed into place rather than copied; an existing
+    .vscode/settings.json is merged instead of replaced.
+    """
+    for dirpath, dirnames, filenames in os.walk(src):
+        rel_dir = Path(dirpath).relative_to(src)
+        target_dir = dst / rel_dir
+        target_dir.mkdir(parents=True, exist_ok=True)
+        for name in filenames:
+            item = Path(dirpath) / name
+            dest_path = target_dir / name
+            if dest_path.exists():
+                if name == "settings.json" and target_dir.name == ".vscode":
+                    handle_vscode_settings(item, dest_path, rel_dir / name, verbose, tracker)
+                    continue
+                try:
+                    # Overwriting in place would have kept the file's permissions
+                    shutil.copymode(dest_path, item)
+                except OSError:
+                    pass
+            os.replace(item, dest_path)
+
+
 def download_template_from_github(
     ai_assistant: str,
     download_dir: Path,
@@ -143,47 +176,63 @@ def download_template_from_github(
     client: httpx.Client = None,
     debug: bool = False,
     github_token: str = None,
+    extract: Optional[Callable[[zipfile.ZipFile, Callable[[Optional[int]], None]], int]] = None,
 ) -> Tuple[Path, dict]:
+    """Fetch the latest release and download the matching template archive.
+
+    With extract, the archive is extracted while it downloads (see
+    _download_pipelined) and metadata["extracted"] holds extract's result;
+    servers without Range support get the sequential download instead.
+    """
     repo_owner = "suportesaude"
     repo_name = "forge" # NOTE: Using legacy repo name for downloads until Forge artifacts are published
 
-    # We shouldn't create a client here if one isn't passed, but the original code did.
-    # However, in modularized code, it's better if the caller provides it or we use a default.
-    # But since we moved client creation to utils (or cli), let's assume it's passed or handle it.
     if client is None:
-        # Fallback if not provided, though ideally should be passed
-        import ssl
-        import truststore
-        ssl_context = truststore.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-        client = httpx.Client(verify=ssl_context)
+        client = get_client()
+
+    release_cache = None if cache_disabled() else ReleaseCache()
 
     if verbose:
         console.print("[cyan]Fetching latest release information...[/cyan]")
     api_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/releases/latest"
+    cached_release = release_cache.get_release(api_url) if release_cache else None
+    headers = _github_auth_headers(github_token)
+    if cached_release and cached_release["etag"]:
+        # A 304 answer is free: no body, and it does not count against the rate limit
+        headers["If-None-Match"] = cached_release["etag"]
 
     try:
         response = client.get(
             api_url,
-            timeout=30,
             follow_redirects=True,
-            headers=_github_auth_headers(github_token),
+            headers=headers,
         )
         status = response.status_code
-        if status != 200:
+        if status == 304 and cached_release:
+            release_data = cached_release["data"]
+        elif status != 200:
             msg = f"GitHub API returned {status} for {api_url}"
             if debug:
                 msg += f"\nResponse headers: {response.headers}\nBody (truncated 500): {response.text[:500]}"
             raise RuntimeError(msg)
-        try:
-            release_data = response.json()
-        except ValueError as je:
-            raise RuntimeError(
-                f"Failed to parse release JSON: {je}\nRaw (truncated 400): {response.text[:400]}"
-            )
+        else:
+            try:
+                release_data = response.json()
+            except ValueError as je:
+                raise RuntimeError(
+                    f"Failed to parse release JSON: {je}\nRaw (truncated 400): {response.text[:400]}"
+                )
+            if release_cache:
+                release_cache.put_release(api_url, response.headers.get("etag"), release_data)
     except Exception as e:
-        console.print(f"[red]Error fetching release information[/red]")
-        console.print(Panel(str(e), title="Fetch Error", border_style="red"))
-        raise typer.Exit(1)
+        if not cached_release:
+            console.print(f"[red]Error fetching release information[/red]")
+            console.print(Panel(str(e), title="Fetch Error", border_style="red"))
+            raise typer.Exit(1)
+        # Offline or rate limited: the last known release is still usable
+        release_data = cached_release["data"]
+        if verbose:
+            console.print(f"[yellow]Using cached release information:[/yellow] {e}")
 
     assets = release_data.get("assets", [])
     pattern = f"forge-kit-template-{ai_assistant}-{script_type}"
@@ -212,69 +261,438 @@ def download_template_from_github(
     download_url = asset["browser_download_url"]
     filename = asset["name"]
     file_size = asset["size"]
+    # GitHub publishes "sha256:<hex>" for release assets
+    digest = asset.get("digest") or ""
+    digest = digest[len("sha256:"):] if digest.startswith("sha256:") else None
 
     if verbose:
         console.print(f"[cyan]Found template:[/cyan] {filename}")
         console.print(f"[cyan]Size:[/cyan] {file_size:,} bytes")
         console.print(f"[cyan]Release:[/cyan] {release_data['tag_name']}")
 
-    zip_path = download_dir / filename
+    metadata = {
+        "filename": filename,
+        "size": file_size,
+        "release": release_data["tag_name"],
+        "asset_url": download_url,
+        "cached": False,
+    }
+    if release_cache:
+        cached_zip = release_cache.get_archive(release_data["tag_name"], filename, file_size, digest)
+        if cached_zip is not None:
+            if verbose:
+                console.print(f"[cyan]Using cached template:[/cyan] {cached_zip}")
+            metadata["cached"] = True
+            return cached_zip, metadata
+        zip_path = release_cache.archive_path(release_data["tag_name"], filename)
+    else:
+        zip_path = download_dir / filename
     if verbose:
         console.print(f"[cyan]Downloading template...[/cyan]")
 
+    if extract is not None:
+        try:
+            metadata["extracted"] = _download_pipelined(
+                client, download_url, file_size, digest, zip_path, _github_auth_headers(github_token), extract
+            )
+        except PipelineUnavailable as e:
+            if verbose:
+                console.print(f"[yellow]Extracting after download:[/yellow] {e}")
+        except Exception as e:
+            console.print(f"[red]Error downloading template[/red]")
+            console.print(Panel(str(e), title="Download Error", border_style="red"))
+            raise typer.Exit(1)
+        else:
+            if verbose:
+                console.print(f"Downloaded and extracted: {filename}")
+            if release_cache:
+                metadata["cached"] = True
+                release_cache.evict(keep=[zip_path])
+            return zip_path, metadata
+
     try:
-        with client.stream(
-            "GET",
-            download_url,
-            timeout=60,
-            follow_redirects=True,
-            headers=_github_auth_headers(github_token),
-        ) as response:
-            if response.status_code != 200:
-                body_sample = response.text[:400]
-                raise RuntimeError(
-                    f"Download failed with {response.status_code}\nHeaders: {response.headers}\nBody (truncated): {body_sample}"
+        if show_progress:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
+                console=console,
+            ) as progress:
+                task = progress.add_task("Downloading...", total=file_size or None)
+                _download_resumable(
+                    client, download_url, zip_path, file_size, digest, _github_auth_headers(github_token),
+                    on_progress=lambda done: progress.update(task, completed=done),
+                    verbose=verbose,
                 )
-            total_size = int(response.headers.get("content-length", 0))
-            with open(zip_path, "wb") as f:
-                if total_size == 0:
-                    for chunk in response.iter_bytes(chunk_size=8192):
-                        f.write(chunk)
-                else:
-                    if show_progress:
-                        with Progress(
-                            SpinnerColumn(),
-                            TextColumn("[progress.description]{task.description}"),
-                            TextColumn("[progress.percentage]{task.percentage:>3.0f}%"),
-                            console=console,
-                        ) as progress:
-                            task = progress.add_task("Downloading...", total=total_size)
-                            downloaded = 0
-                            for chunk in response.iter_bytes(chunk_size=8192):
-                                f.write(chunk)
-                                downloaded += len(chunk)
-                                progress.update(task, completed=downloaded)
-                    else:
-                        for chunk in response.iter_bytes(chunk_size=8192):
-                            f.write(chunk)
+        else:
+            _download_resumable(
+                client, download_url, zip_path, file_size, digest, _github_auth_headers(github_token),
+                verbose=verbose,
+            )
     except Exception as e:
         console.print(f"[red]Error downloading template[/red]")
-        detail = str(e)
-        if zip_path.exists():
-            zip_path.unlink()
-        console.print(Panel(detail, title="Download Error", border_style="red"))
+        console.print(Panel(str(e), title="Download Error", border_style="red"))
         raise typer.Exit(1)
     if verbose:
         console.print(f"Downloaded: {filename}")
-    metadata = {
-        "filename": filename,
-        "size": file_size,
-        "release": release_data["tag_name"],
-        "asset_url": download_url,
-    }
+    if release_cache:
+        metadata["cached"] = True
+        release_cache.evict(keep=[zip_path])
     return zip_path, metadata
 
 
+class DownloadError(RuntimeError):
+    """A template download failed; retryable tells whether another attempt may succeed."""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class PipelineUnavailable(Exception):
+    """The server or platform cannot support a pipelined download; fall back to sequential."""
+
+
+def download_chunk_size(total: int) -> int:
+    """Read size for a download of total bytes: about 1/32 of it, within 64 KiB..1 MiB."""
+    return max(MIN_CHUNK_SIZE, min(MAX_CHUNK_SIZE, total // 32))
+
+
+def _preallocate(fd: int, size: int) -> None:
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        # Not every platform or filesystem supports it; a sparse file will do
+        os.ftruncate(fd, size)
+
+
+class _BodyDownload(threading.Thread):
+    """Write bytes [0, end) of url into fd in the background, announcing progress."""
+
+    def __init__(self, client: httpx.Client, url: str, headers: dict, fd: int, end: int):
+        super().__init__(daemon=True)
+        self.client, self.url, self.headers, self.fd, self.end = client, url, headers, fd, end
+        self.received = 0
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self.done = False
+        self.cond = threading.Condition()
+
+    def run(self) -> None:
+        try:
+            # Offsets are positions in the stored archive, so no content coding
+            headers = {**self.headers, "Accept-Encoding": "identity", "Range": f"bytes=0-{self.end - 1}"}
+            with self.client.stream("GET", self.url, follow_redirects=True, headers=headers) as response:
+                if response.status_code != 206:
+                    raise DownloadError(f"Download failed with {response.status_code}")
+                offset = 0
+                for chunk in response.iter_bytes(chunk_size=download_chunk_size(self.end)):
+                    if self.cancelled:
+                        return
+                    os.pwrite(self.fd, chunk, offset)
+                    offset += len(chunk)
+                    with self.cond:
+                        self.received = offset
+                        self.cond.notify_all()
+                if offset != self.end:
+                    raise DownloadError(f"Download ended after {offset:,} of {self.end:,} bytes")
+        except BaseException as e:
+            self.error = e
+        finally:
+            with self.cond:
+                self.done = True
+                self.cond.notify_all()
+
+    def wait_for(self, offset: Optional[int]) -> None:
+        """Block until bytes up to offset (None: all of them) are on disk."""
+        offset = self.end if offset is None else min(offset, self.end)
+        with self.cond:
+            while self.received < offset and not self.done:
+                self.cond.wait()
+        if self.received < offset:
+            raise DownloadError(f"Download failed: {self.error}") from self.error
+
+
+def _verify_digest(path: Path, digest: Optional[str]) -> None:
+    if digest is not None and file_digest(path) != digest.lower():
+        raise DownloadError(f"Checksum mismatch for {path.name}: expected sha256 {digest}")
+
+
+def _retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter, capped at DOWNLOAD_BACKOFF_MAX seconds."""
+    return random.uniform(0, min(DOWNLOAD_BACKOFF_MAX, DOWNLOAD_BACKOFF * 2 ** attempt))
+
+
+def _download_resumable(
+    client: httpx.Client,
+    url: str,
+    dest: Path,
+    size: int,
+    digest: Optional[str],
+    headers: dict,
+    *,
+    on_progress: Optional[Callable[[int], None]] = None,
+    verbose: bool = False,
+) -> None:
+    """Download url to dest through a .part file that survives failures.
+
+    Each attempt resumes from the bytes already in the .part file with a
+    Range request, also across separate runs, and failed attempts are retried
+    with exponential backoff. dest only appears once the size and (when
+    known) the sha256 digest match; a corrupt .part file is discarded.
+    """
+    part = dest.with_name(f".{dest.name}.part")
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    attempt = 0
+    while True:
+        try:
+            offset = part.stat().st_size if part.exists() else 0
+            if size and offset > size:
+                part.unlink()
+                offset = 0
+            if not size or offset < size:
+                offset = _download_part(client, url, part, offset, headers, on_progress)
+            if size and offset != size:
+                raise DownloadError(f"Download ended after {offset:,} of {size:,} bytes")
+            try:
+                _verify_digest(part, digest)
+            except DownloadError:
+                # Never resume from bytes that failed verification
+                part.unlink()
+                raise
+            os.replace(part, dest)
+            return
+        except (httpx.TransportError, DownloadError) as e:
+            attempt += 1
+            if not getattr(e, "retryable", True) or attempt >= DOWNLOAD_ATTEMPTS:
+                raise
+            delay = _retry_delay(attempt)
+            if verbose:
+                console.print(f"[yellow]Download interrupted ({e}); retrying in {delay:.1f}s[/yellow]")
+            time.sleep(delay)
+
+
+def _download_part(
+    client: httpx.Client,
+    url: str,
+    part: Path,
+    offset: int,
+    headers: dict,
+    on_progress: Optional[Callable[[int], None]],
+) -> int:
+    """Append the rest of url to part, starting at offset; return the new size."""
+    # Range offsets count stored bytes, so the body must not be re-encoded
+    headers = {**headers, "Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+    with client.stream("GET", url, follow_redirects=True, headers=headers) as response:
+        if response.status_code == 200:
+            # Full body: the server ignored the range or there was none
+            offset = 0
+        elif response.status_code != 206:
+            response.read()
+            status = response.status_code
+            if status == 416:
+                # Our .part no longer matches the asset
+                part.unlink(missing_ok=True)
+            raise DownloadError(
+                f"Download failed with {status}\nHeaders: {response.headers}\nBody (truncated): {response.text[:400]}",
+                # Server errors and rate limits are worth another attempt, the rest are not
+                retryable=status >= 500 or status in (408, 416, 429),
+            )
+        total = offset + int(response.headers.get("content-length", 0))
+        # Chunks are written as they arrive, so a dropped connection loses
+        # nothing already received; the file buffer batches the writes.
+        with open(part, "ab" if offset else "wb", buffering=download_chunk_size(total)) as f:
+            for chunk in response.iter_bytes():
+                f.write(chunk)
+                offset += len(chunk)
+                if on_progress:
+                    on_progress(offset)
+            f.flush()
+            os.fsync(f.fileno())
+    return offset
+
+
+def _fetch_range(client: httpx.Client, url: str, headers: dict, start: int, end: int) -> bytes:
+    """Bytes [start, end) of url; PipelineUnavailable if the server ignores the range."""
+    response = client.get(
+        url,
+        follow_redirects=True,
+        headers={**headers, "Accept-Encoding": "identity", "Range": f"bytes={start}-{end - 1}"},
+    )
+    if response.status_code != 206 or len(response.content) != end - start:
+        raise PipelineUnavailable(f"server answered the Range request with {response.status_code}")
+    return response.content
+
+
+def _central_directory_offset(tail: bytes) -> Optional[int]:
+    """Offset of the central directory, from the end record found in tail (None for ZIP64 or no record)."""
+    at = tail.rfind(ZIP_END_SIGNATURE)
+    if at < 0 or len(tail) - at < 22:
+        return None
+    offset = int.from_bytes(tail[at + 16:at + 20], "little")
+    return None if offset == 0xFFFFFFFF else offset
+
+
+def _download_pipelined(
+    client: httpx.Client,
+    url: str,
+    size: int,
+    digest: Optional[str],
+    archive_path: Path,
+    headers: dict,
+    extract: Callable[[zipfile.ZipFile, Callable[[Optional[int]], None]], int],
+):
+    """Download a ZIP into archive_path while extract reads members from it.
+
+    A ZIP is indexed by the central directory at its end, so that is fetched
+    first with Range requests and written to the end of a preallocated file.
+    The body then downloads in a background thread while extract works
+    through the members in archive order, each waiting only until its own
+    bytes have arrived. Network and disk work overlap instead of adding up.
+
+    The digest can only be checked once everything has arrived, so extract
+    must write somewhere disposable. Any network failure or a digest
+    mismatch raises PipelineUnavailable, leaving the retrying sequential
+    download to start over; the archive is not kept.
+    """
+    if not hasattr(os, "pwrite") or size <= 0:
+        raise PipelineUnavailable("positional writes are not available")
+    try:
+        return _download_pipelined_once(client, url, size, digest, archive_path, headers, extract)
+    except (httpx.HTTPError, DownloadError) as e:
+        raise PipelineUnavailable(f"pipelined download failed ({e})") from e
+
+
+def _download_pipelined_once(
+    client: httpx.Client,
+    url: str,
+    size: int,
+    digest: Optional[str],
+    archive_path: Path,
+    headers: dict,
+    extract: Callable[[zipfile.ZipFile, Callable[[Optional[int]], None]], int],
+):
+    tail_start = max(0, size - PIPELINE_TAIL_BYTES)
+    with atomic_writer(archive_path, binary=True) as spool:
+        fd = spool.fileno()
+        _preallocate(fd, size)
+        tail = _fetch_range(client, url, headers, tail_start, size)
+        index_start = _central_directory_offset(tail)
+        if index_start is None:
+            raise PipelineUnavailable("no end of central directory record in the archive tail")
+        if index_start < tail_start:
+            # Large archive index: fetch the rest of it
+            tail = _fetch_range(client, url, headers, index_start, tail_start) + tail
+            tail_start = index_start
+        os.pwrite(fd, tail, tail_start)
+        body_size = tail_start
+        try:
+            reader = zipfile.ZipFile(spool.name)
+        except zipfile.BadZipFile:
+            raise PipelineUnavailable("the archive index could not be read from its tail")
+        with reader:
+            if body_size == 0:
+                result = extract(reader, lambda offset: None)
+            else:
+                body = _BodyDownload(client, url, headers, fd, body_size)
+                body.start()
+                try:
+                    result = extract(reader, body.wait_for)
+                    body.wait_for(None)
+                finally:
+                    body.cancelled = True
+                    body.join()
+        _verify_digest(Path(spool.name), digest)
+    return result
+
+
+def _member_parts(name: str) -> Tuple[str, ...]:
+    """Path components of an archive member, minus anything that could escape the target."""
+    # Same rules as ZipFile.extract: drop drive letters, roots, "." and ".."
+    return tuple(
+        part for part in name.replace("\\", "/").split("/")
+        if part not in ("", ".", "..") and not part.endswith(":")
+    )
+
+
+def _flatten_prefix(members: List[Tuple[Tuple[str, ...], zipfile.ZipInfo]]) -> int:
+    """1 if every member sits under one top-level directory (which is then dropped), else 0."""
+    top_level = {parts[0] for parts, _ in members}
+    if len(top_level) != 1:
+        return 0
+    is_dir = any(len(parts) > 1 or info.is_dir() for parts, info in members)
+    return 1 if is_dir else 0
+
+
+def extract_template(
+    zip_ref: zipfile.ZipFile,
+    project_path: Path,
+    *,
+    verbose: bool = True,
+    tracker: StepTracker | None = None,
+    wait: Optional[Callable[[Optional[int]], None]] = None,
+) -> int:
+    """Stream archive members straight to their place under project_path.
+
+    A single top-level directory is flattened away and an existing
+    .vscode/settings.json is merged rather than overwritten, as the template
+    expects, without extracting to a temporary tree first. Returns the number
+    of files written.
+
+    For an archive that is still downloading, wait(offset) must block until
+    the bytes before offset (None: the whole file) are available; members are
+    then extracted in archive order.
+    """
+    members = [(_member_parts(info.filename), info) for info in zip_ref.infolist()]
+    members = [(parts, info) for parts, info in members if parts]
+    if wait is not None:
+        members.sort(key=lambda member: member[1].header_offset)
+    # Each member ends where the next one starts
+    ends = [info.header_offset for _, info in members[1:]] + [None]
+    strip = _flatten_prefix(members)
+    if strip:
+        if tracker:
+            tracker.add("flatten", "Flatten nested directory")
+            tracker.complete("flatten")
+        elif verbose:
+            console.print(f"[cyan]Found nested directory structure[/cyan]")
+
+    made_dirs = set()
+    existing_top = set()
+    written = 0
+    for (parts, info), end in zip(members, ends):
+        parts = parts[strip:]
+        if not parts:
+            continue
+        dest_path = project_path.joinpath(*parts)
+        if verbose and not tracker and parts[0] not in existing_top and (project_path / parts[0]).exists():
+            existing_top.add(parts[0])
+            kind = "Merging directory" if len(parts) > 1 or info.is_dir() else "Overwriting file"
+            console.print(f"[yellow]{kind}:[/yellow] {parts[0]}")
+        if info.is_dir():
+            if dest_path not in made_dirs:
+                dest_path.mkdir(parents=True, exist_ok=True)
+                made_dirs.add(dest_path)
+            continue
+        if dest_path.parent not in made_dirs:
+            dest_path.parent.mkdir(parents=True, exist_ok=True)
+            made_dirs.add(dest_path.parent)
+        if wait is not None:
+            wait(end)
+        if parts[-2:] == (".vscode", "settings.json") and dest_path.exists():
+            # Merge instead of overwrite
+            merge_vscode_settings(
+                zip_ref.read(info), dest_path, Path(*parts), verbose, tracker
+            )
+        else:
+            with zip_ref.open(info) as src, open(dest_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, EXTRACT_CHUNK_SIZE)
+        written += 1
+    return written
+
+
 def download_and_extract_template(
     project_path: Path,
     ai_assistant: str,
@@ -286,12 +704,30 @@ def download_and_extract_template(
     client: httpx.Client = None,
     debug: bool = False,
     github_token: str = None,
+    pipelined: bool = False,
 ) -> Path:
     """Download the latest release and extract it to create a new project.
     Returns project_path. Uses tracker if provided (with keys: fetch, download, extract, cleanup)
+    With pipelined, extraction starts while the archive is still downloading,
+    into a staging directory that is moved into place once the archive has
+    been verified.
     """
     current_dir = Path.cwd()
 
+    extract = None
+    staging = None
+    if pipelined:
+        # On the same filesystem as the target, so moving it in is a rename
+        staging_parent = project_path if is_current_dir else project_path.parent
+        staging_parent.mkdir(parents=True, exist_ok=True)
+        # mkdir rather than mkdtemp: the directory becomes the project, so
+        # it gets the umask's permissions instead of 0700
+        staging = staging_parent / f".forge-extract-{secrets.token_hex(4)}"
+        staging.mkdir()
+
+        def extract(zip_ref, wait):
+            return extract_template(zip_ref, staging, verbose=verbose, tracker=tracker, wait=wait)
+
     if tracker:
         tracker.start("fetch", "contacting GitHub API")
     try:
@@ -304,141 +740,65 @@ def download_and_extract_template(
             client=client,
             debug=debug,
             github_token=github_token,
+            extract=extract,
         )
         if tracker:
             tracker.complete(
                 "fetch", f"release {meta['release']} ({meta['size']:,} bytes)"
             )
             tracker.add("download", "Download template")
-            tracker.complete("download", meta["filename"])
+            tracker.complete("download", f"{meta['filename']} (cached)" if meta["cached"] else meta["filename"])
     except Exception as e:
         if tracker:
             tracker.error("fetch", str(e))
         else:
             if verbose:
                 console.print(f"[red]Error downloading template:[/red] {e}")
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
         raise
 
     if tracker:
         tracker.add("extract", "Extract template")
         tracker.start("extract")
-    elif verbose:
+    elif verbose and "extracted" not in meta:
         console.print("Extracting template...")
 
     try:
-        if not is_current_dir:
-            project_path.mkdir(parents=True)
-
-        with zipfile.ZipFile(zip_path, "r") as zip_ref:
-            zip_contents = zip_ref.namelist()
-            if tracker:
-                tracker.start("zip-list")
-                tracker.complete("zip-list", f"{len(zip_contents)} entries")
-            elif verbose:
-                console.print(f"[cyan]ZIP contains {len(zip_contents)} items[/cyan]")
-
+        if "extracted" in meta:
+            # Extracted while downloading and verified since
+            written = meta["extracted"]
             if is_current_dir:
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    temp_path = Path(temp_dir)
-                    zip_ref.extractall(temp_path)
-
-                    extracted_items = list(temp_path.iterdir())
-                    if tracker:
-                        tracker.start("extracted-summary")
-                        tracker.complete(
-                            "extracted-summary", f"temp {len(extracted_items)} items"
-                        )
-                    elif verbose:
-                        console.print(
-                            f"[cyan]Extracted {len(extracted_items)} items to temp location[/cyan]"
-                        )
-
-                    source_dir = temp_path
-                    if len(extracted_items) == 1 and extracted_items[0].is_dir():
-                        source_dir = extracted_items[0]
-                        if tracker:
-                            tracker.add("flatten", "Flatten nested directory")
-                            tracker.complete("flatten")
-                        elif verbose:
-                            console.print(
-                                f"[cyan]Found nested directory structure[/cyan]"
-                            )
-
-                    for item in source_dir.iterdir():
-                        dest_path = project_path / item.name
-                        if item.is_dir():
-                            if dest_path.exists():
-                                if verbose and not tracker:
-                                    console.print(
-                                        f"[yellow]Merging directory:[/yellow] {item.name}"
-                                    )
-                                for sub_item in item.rglob("*"):
-                                    if sub_item.is_file():
-                                        rel_path = sub_item.relative_to(item)
-                                        dest_file = dest_path / rel_path
-                                        dest_file.parent.mkdir(
-                                            parents=True, exist_ok=True
-                                        )
-                                        # Special handling for .vscode/settings.json - merge instead of overwrite
-                                        if (
-                                            dest_file.name == "settings.json"
-                                            and dest_file.parent.name == ".vscode"
-                                        ):
-                                            handle_vscode_settings(
-                                                sub_item,
-                                                dest_file,
-                                                rel_path,
-                                                verbose,
-                                                tracker,
-                                            )
-                                        else:
-                                            shutil.copy2(sub_item, dest_file)
-                            else:
-                                shutil.copytree(item, dest_path)
-                        else:
-                            if dest_path.exists() and verbose and not tracker:
-                                console.print(
-                                    f"[yellow]Overwriting file:[/yellow] {item.name}"
-                                )
-                            shutil.copy2(item, dest_path)
-                    if verbose and not tracker:
-                        console.print(
-                            f"[cyan]Template files merged into current directory[/cyan]"
-                        )
+                _move_directory(staging, project_path, verbose=verbose, tracker=tracker)
             else:
-                zip_ref.extractall(project_path)
-
-                extracted_items = list(project_path.iterdir())
+                os.rename(staging, project_path)
+        else:
+            if staging is not None:
+                # Fell back to extracting after the download
+                shutil.rmtree(staging, ignore_errors=True)
+            if not is_current_dir:
+                project_path.mkdir(parents=True)
+
+            with zipfile.ZipFile(zip_path, "r") as zip_ref:
+                zip_contents = zip_ref.namelist()
                 if tracker:
-                    tracker.start("extracted-summary")
-                    tracker.complete(
-                        "extracted-summary", f"{len(extracted_items)} top-level items"
-                    )
+                    tracker.start("zip-list")
+                    tracker.complete("zip-list", f"{len(zip_contents)} entries")
                 elif verbose:
-                    console.print(
-                        f"[cyan]Extracted {len(extracted_items)} items to {project_path}:[/cyan]"
-                    )
-                    for item in extracted_items:
-                        console.print(
-                            f"  - {item.name} ({'dir' if item.is_dir() else 'file'})"
-                        )
-
-                if len(extracted_items) == 1 and extracted_items[0].is_dir():
-                    nested_dir = extracted_items[0]
-                    temp_move_dir = project_path.parent / f"{project_path.name}_temp"
-
-                    shutil.move(str(nested_dir), str(temp_move_dir))
+                    console.print(f"[cyan]ZIP contains {len(zip_contents)} items[/cyan]")
 
-                    project_path.rmdir()
-
-                    shutil.move(str(temp_move_dir), str(project_path))
-                    if tracker:
-                        tracker.add("flatten", "Flatten nested directory")
-                        tracker.complete("flatten")
-                    elif verbose:
-                        console.print(
-                            f"[cyan]Flattened nested directory structure[/cyan]"
-                        )
+                written = extract_template(
+                    zip_ref, project_path, verbose=verbose, tracker=tracker
+                )
+        if tracker:
+            tracker.start("extracted-summary")
+            tracker.complete("extracted-summary", f"{written} files written")
+        elif verbose:
+            console.print(f"[cyan]Extracted {written} files to {project_path}[/cyan]")
+            if is_current_dir:
+                console.print(
+                    f"[cyan]Template files merged into current directory[/cyan]"
+                )
 
     except Exception as e:
         if tracker:
@@ -458,10 +818,16 @@ def download_and_extract_template(
         if tracker:
             tracker.complete("extract")
     finally:
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
         if tracker:
             tracker.add("cleanup", "Remove temporary archive")
 
-        if zip_path.exists():
+        if meta["cached"]:
+            # Kept in the user cache for the next init
+            if tracker:
+                tracker.skip("cleanup", "archive kept in cache")
+        elif zip_path.exists():
             zip_path.unlink()
             if tracker:
                 tracker.complete("cleanup")
@@ -2,11 +2,18 @@ import os
 import subprocess
 import shutil
 import json
+import secrets
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import IO, Iterator, Tuple, Optional
 import typer
 from forge.logging import console, StepTracker
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
 def is_git_repo(path: Path = None) -> bool:
     """Check if the specified path is inside a git repository."""
     if path is None:
@@ -71,18 +78,76 @@ def init_git_repo(
         os.chdir(original_cwd)
 
 
+@contextmanager
+def atomic_writer(path: Path, binary: bool = False, encoding: str = "utf-8") -> Iterator[IO]:
+    """Open a temp file next to path and atomically replace path with it on success.
+
+    Readers either see the previous content or the complete new content, never a
+    partially written file. The temp file is removed if the block raises.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    try:
+        with open(tmp_path, "xb" if binary else "x", encoding=None if binary else encoding) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            # Keep the permissions of the file being replaced
+            shutil.copymode(path, tmp_path)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+
+
+@contextmanager
+def file_lock(path: Path, shared: bool = False) -> Iterator[None]:
+    """Hold an advisory lock on path (created if needed) for the duration of the block.
+
+    Uses flock, so the lock is released if the process dies. Where fcntl is not
+    available the block simply runs unlocked.
+    """
+    if fcntl is None:
+        yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
 def handle_vscode_settings(
     sub_item, dest_file, rel_path, verbose=False, tracker=None
 ) -> None:
     """Handle merging or copying of .vscode/settings.json files."""
+    copied = not dest_file.exists()
+    with open(sub_item, "rb") as f:
+        merge_vscode_settings(f.read(), dest_file, rel_path, verbose, tracker)
+    if copied:
+        shutil.copystat(sub_item, dest_file)
+
+
+def merge_vscode_settings(
+    content: bytes, dest_file, rel_path, verbose=False, tracker=None
+) -> None:
+    """Merge settings.json content (raw bytes) into dest_file, or write it if there is none."""
 
     def log(message, color="green"):
         if verbose and not tracker:
             console.print(f"[{color}]{message}[/] {rel_path}")
 
     try:
-        with open(sub_item, "r", encoding="utf-8") as f:
-            new_settings = json.load(f)
+        new_settings = json.loads(content)
 
         if dest_file.exists():
             merged = merge_json_files(
@@ -93,12 +158,12 @@ def handle_vscode_settings(
                 f.write("\n")
             log("Merged:", "green")
         else:
-            shutil.copy2(sub_item, dest_file)
+            dest_file.write_bytes(content)
             log("Copied (no existing settings.json):", "blue")
 
     except Exception as e:
         log(f"Warning: Could not merge, copying instead: {e}", "yellow")
-        shutil.copy2(sub_item, dest_file)
+        dest_file.write_bytes(content)
 
 
 def merge_json_files(
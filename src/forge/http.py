@@ -0,0 +1,77 @@
+import atexit
+import os
+from typing import Any, Dict
+
+# One pooled client per TLS mode serves every request forge makes, so the API
+# call and the asset download share connections (and TLS handshakes) when they
+# hit the same host. httpx, truststore and h2 are imported on first use only.
+
+# Connection pool limits
+MAX_CONNECTIONS = 10
+MAX_KEEPALIVE_CONNECTIONS = 5
+# Seconds an idle keep-alive connection is kept open
+KEEPALIVE_EXPIRY = 30.0
+
+# Timeouts in seconds; override with FORGE_HTTP_TIMEOUT / FORGE_HTTP_CONNECT_TIMEOUT
+DEFAULT_TIMEOUT = 60.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+_ssl_context = None
+# verify flag -> client
+_clients: Dict[bool, Any] = {}
+
+def get_ssl_context():
+    """Return the process-wide truststore SSL context, creating it on first use."""
+    global _ssl_context
+    if _ssl_context is None:
+        import ssl
+        import truststore
+        _ssl_context = truststore.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    return _ssl_context
+
+def _env_seconds(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, ""))
+    except ValueError:
+        return default
+
+def http2_enabled() -> bool:
+    """HTTP/2 is used when the optional h2 package is installed, unless FORGE_HTTP2=0."""
+    if os.getenv("FORGE_HTTP2", "").strip() == "0":
+        return False
+    from importlib.util import find_spec
+    return find_spec("h2") is not None
+
+def get_client(verify: bool = True):
+    """Return the process-wide pooled httpx client, creating it on first use.
+
+    verify=False gives a separate client that skips certificate checks
+    (forge init --skip-tls). Clients are closed when the process exits.
+    """
+    client = _clients.get(verify)
+    if client is None:
+        import httpx
+        timeout = _env_seconds("FORGE_HTTP_TIMEOUT", DEFAULT_TIMEOUT)
+        client = httpx.Client(
+            verify=get_ssl_context() if verify else False,
+            http2=http2_enabled(),
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                timeout, connect=_env_seconds("FORGE_HTTP_CONNECT_TIMEOUT", DEFAULT_CONNECT_TIMEOUT)
+            ),
+            follow_redirects=True,
+        )
+        if not _clients:
+            atexit.register(close_clients)
+        _clients[verify] = client
+    return client
+
+def close_clients() -> None:
+    """Close the pooled clients and their connections."""
+    while _clients:
+        _, client = _clients.popitem()
+        client.close()
@@ -1,9 +1,7 @@
 import typer
-import readchar
 from rich.console import Console
 from rich.panel import Panel
 from rich.tree import Tree
-from rich.live import Live
 from rich.table import Table
 from rich.align import Align
 from rich.text import Text
@@ -114,6 +112,7 @@ class StepTracker:
 
 def get_key():
     """Get a single keypress in a cross-platform way using readchar."""
+    import readchar
     key = readchar.readkey()
 
     if key == readchar.key.UP or key == readchar.key.CTRL_P:
@@ -147,6 +146,8 @@ def select_with_arrows(
     Returns:
         Selected option key
     """
+    from rich.live import Live
+
     option_keys = list(options.keys())
     if default_key and default_key in option_keys:
         selected_index = option_keys.index(default_key)
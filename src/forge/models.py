@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from enum import Enum
 from typing import List, Dict, Optional, Any
 from datetime import datetime
@@ -20,7 +20,24 @@ class Status(str, Enum):
     COMPLETED = "completed"
     FAILED = "failed"
 
-@dataclass
+# Value -> member lookups; a dict hit is much cheaper than calling the Enum
+_PHASES: Dict[Any, Phase] = {member.value: member for member in Phase}
+_STATUSES: Dict[Any, Status] = {member.value: member for member in Status}
+_PHASES.update((member, member) for member in Phase)
+_STATUSES.update((member, member) for member in Status)
+
+def to_phase(value: Any) -> Phase:
+    phase = _PHASES.get(value)
+    return phase if phase is not None else Phase(value)
+
+def to_status(value: Any) -> Status:
+    status = _STATUSES.get(value)
+    return status if status is not None else Status(value)
+
+# The models are serialized by hand rather than with dataclasses.asdict, which
+# deep-copies recursively and dominates load/save time for large features.
+
+@dataclass(slots=True)
 class Task:
     id: str
     description: str
@@ -28,14 +45,45 @@ class Task:
     file_path: Optional[str] = None
     test_file: Optional[str] = None
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "description": self.description,
+            "status": self.status.value,
+            "file_path": self.file_path,
+            "test_file": self.test_file,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Task':
+        return cls(
+            data["id"],
+            data["description"],
+            to_status(data.get("status", Status.PENDING)),
+            data.get("file_path"),
+            data.get("test_file"),
+        )
+
+@dataclass(slots=True)
 class QualityGate:
     name: str
     passed: bool
     timestamp: str
     details: Optional[str] = None
 
-@dataclass
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "passed": self.passed,
+            "timestamp": self.timestamp,
+            "details": self.details,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QualityGate':
+        return cls(data["name"], data["passed"], data["timestamp"], data.get("details"))
+
+@dataclass(slots=True)
 class FeatureState:
     name: str
     phase: Phase = Phase.INIT
@@ -45,27 +93,36 @@ class FeatureState:
     quality_gates: List[QualityGate] = field(default_factory=list)
     created_at: str = field(default_factory=lambda: datetime.now().isoformat())
     updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    # Bumped by the state store on every write; used to detect concurrent updates
+    version: int = 0
 
     def to_dict(self) -> Dict[str, Any]:
-        return asdict(self)
+        return {
+            "name": self.name,
+            "phase": self.phase.value,
+            "status": self.status.value,
+            "tasks": [task.to_dict() for task in self.tasks],
+            "artifacts": dict(self.artifacts),
+            "quality_gates": [gate.to_dict() for gate in self.quality_gates],
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "version": self.version,
+        }
 
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'FeatureState':
         # Handle nested objects
-        tasks = [Task(**t) for t in data.get("tasks", [])]
-        quality_gates = [QualityGate(**q) for q in data.get("quality_gates", [])]
-
-        # Convert string enums back to Enum objects
-        phase = Phase(data.get("phase", Phase.INIT))
-        status = Status(data.get("status", Status.PENDING))
-
+        task_from_dict = Task.from_dict
+        gate_from_dict = QualityGate.from_dict
         return cls(
             name=data["name"],
-            phase=phase,
-            status=status,
-            tasks=tasks,
-            artifacts=data.get("artifacts", {}),
-            quality_gates=quality_gates,
+            # Convert string enums back to Enum objects
+            phase=to_phase(data.get("phase", Phase.INIT)),
+            status=to_status(data.get("status", Status.PENDING)),
+            tasks=[task_from_dict(t) for t in data.get("tasks", [])],
+            artifacts=dict(data.get("artifacts", {})),
+            quality_gates=[gate_from_dict(q) for q in data.get("quality_gates", [])],
             created_at=data.get("created_at", ""),
-            updated_at=data.get("updated_at", "")
+            updated_at=data.get("updated_at", ""),
+            version=data.get("version", 0),
         )
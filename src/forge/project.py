@@ -0,0 +1,35 @@
+import os
+from pathlib import Path
+from typing import Dict, Optional
+
+FORGE_DIR = ".forge"
+
+# Start directory -> discovered root, for the life of the process
+_roots: Dict[str, Path] = {}
+
+def find_project_root(start: Optional[Path] = None) -> Path:
+    """Return the nearest directory at or above start (default: cwd) containing .forge.
+
+    When there is none, start itself is the root, so a new .forge is created
+    there as before. The home directory is never picked up from below, since a
+    stray ~/.forge must not capture every project. Results are cached per
+    process and start directory.
+    """
+    key = str(start) if start is not None else os.getcwd()
+    root = _roots.get(key)
+    if root is None:
+        here = Path(key)
+        home = Path.home()
+        root = here
+        for candidate in (here, *here.parents):
+            if candidate == home and candidate != here:
+                break
+            if (candidate / FORGE_DIR).is_dir():
+                root = candidate
+                break
+        _roots[key] = root
+    return root
+
+def clear_project_root_cache() -> None:
+    """Forget discovered roots, e.g. after creating or removing a .forge directory."""
+    _roots.clear()
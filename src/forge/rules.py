@@ -1,16 +1,32 @@
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
 import typer
-from forge.state import load_state
-from forge.compiler.markdown import process_template
+from forge.state import get_forge_path, load_state
+from forge.cache import CompileCache, Dependencies, Stamp, stat_stamp
+from forge.filesystem import atomic_writer
+from forge.compiler.markdown import get_engine, process_template
+from forge.stack import NODE_MANIFESTS, PYTHON_MANIFESTS, detect_stack
 
 app = typer.Typer()
 
+# Read size when streaming a cached compile into the output file
+STREAM_CHUNK_SIZE = 1 << 16
+
+# Rule blocks are small, so compile time on remote mounts is read latency;
+# this many reads are kept in flight at once.
+RULE_LOADER_THREADS = 8
+
+# Directories never searched for sub-projects in --workspace mode
+WORKSPACE_SKIP_DIRS = {"node_modules", "__pycache__", "venv", "dist", "build", "target"}
+
 def get_rules_dir() -> Path:
     """Resolve the rules directory (Project .forge or Repo source)."""
     # 1. Deployed project structure (created by forge init)
-    project_rules = Path.cwd() / ".forge" / "templates" / "rules"
+    project_rules = get_forge_path() / "templates" / "rules"
     if project_rules.exists():
         return project_rules
 
@@ -21,101 +37,235 @@ def get_rules_dir() -> Path:
 
     raise FileNotFoundError("Could not find templates/rules directory.")
 
+def get_rule_block_path(category: str, name: str, rules_dir: Optional[Path] = None) -> Path:
+    """Path of a rule block inside the rules directory."""
+    return (rules_dir or get_rules_dir()) / category / f"{name}.md"
+
+def read_rule_block(path: Path) -> str:
+    """Read a rule block file, or return a placeholder comment if it is missing."""
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        return f"<!-- Missing rule block: {path.parent.name}/{path.stem} -->"
+
 def load_rule_block(category: str, name: str) -> str:
     """Load a specific rule block from templates."""
-    rules_dir = get_rules_dir()
-    path = rules_dir / category / f"{name}.md"
-
-    if not path.exists():
-        return f"<!-- Missing rule block: {category}/{name} -->"
-    return path.read_text()
-
-def detect_stack(project_path: Path) -> List[str]:
-    """Auto-detect the tech stack based on files."""
-    tags = []
-
-    # Python
-    if (project_path / "pyproject.toml").exists() or (project_path / "requirements.txt").exists():
-        tags.append("languages/python")
-
-        # Frameworks detection (naive)
-        content = ""
-        if (project_path / "pyproject.toml").exists():
-            content += (project_path / "pyproject.toml").read_text()
-        if (project_path / "requirements.txt").exists():
-            content += (project_path / "requirements.txt").read_text()
-
-        if "fastapi" in content:
-            tags.append("frameworks/fastapi")
-        if "django" in content:
-            tags.append("frameworks/django")
-
-    # Node/JS
-    if (project_path / "package.json").exists():
-        content = (project_path / "package.json").read_text()
-        if "typescript" in content:
-            tags.append("languages/typescript")
-        if "next" in content:
-            tags.append("frameworks/nextjs")
-        if "react" in content:
-            tags.append("frameworks/react")
-        if "tailwindcss" in content:
-            tags.append("frameworks/tailwind")
-
-    return tags
+    return read_rule_block(get_rule_block_path(category, name))
 
-@app.command()
-def compile(
-    output: Path = Path(".cursorrules"),
-    role: str = "developer",
-    tags: Optional[List[str]] = None,
-):
-    """
-    Compile a .cursorrules file from the rules library.
-    """
-    if tags is None:
-        tags = detect_stack(Path.cwd())
+def load_rule_blocks(paths: List[Path]) -> Iterator[str]:
+    """Read rule blocks concurrently, yielding their contents in the order given."""
+    if len(paths) <= 1:
+        yield from map(read_rule_block, paths)
+        return
+    with ThreadPoolExecutor(max_workers=min(RULE_LOADER_THREADS, len(paths))) as pool:
+        yield from pool.map(read_rule_block, paths)
 
-    print(f"Detected tags: {tags}")
+def load_rules_library(rules_dir: Path) -> Tuple[Dict[Path, str], Dict[Path, Stamp]]:
+    """Read every rule and embeddable file under rules_dir, keyed by path.
 
-    content = []
+    Also returns each file's stamp from before it was read, for the compile cache.
+    """
+    paths = sorted(rules_dir.rglob("*.md"))
+    stamps = {path: stat_stamp(path) for path in paths}
+    return dict(zip(paths, load_rule_blocks(paths))), stamps
 
-    # 0. Phase Context (from state.json)
-    state = load_state()
-    content.append(f"<!-- Context: Phase={state.phase.value}, Status={state.status.value} -->")
+def get_rule_search_paths(rules_dir: Path) -> List[Path]:
+    """Search paths for embeds inside rule blocks: the rules dir and its subdirectories."""
+    search_paths = [rules_dir]
+    # Add subdirectories to search paths
+    for item in rules_dir.iterdir():
+        if item.is_dir():
+            search_paths.append(item)
+    return search_paths
 
+def resolve_rule_blocks(role: str, tags: List[str]) -> List[Tuple[str, str]]:
+    """Return the (category, name) rule blocks to compile, in output order."""
     # 1. Role / Persona
-    content.append(load_rule_block("roles", role))
+    blocks = [("roles", role)]
 
     # 2. Core Rules (Always included)
-    content.append(load_rule_block("core", "behavior"))
-    content.append(load_rule_block("core", "tdd"))
-    content.append(load_rule_block("patterns", "naming-conventions"))
+    blocks.append(("core", "behavior"))
+    blocks.append(("core", "tdd"))
+    blocks.append(("patterns", "naming-conventions"))
 
     # Check for UI frameworks to include Atomic Design
     ui_frameworks = ["frameworks/react", "frameworks/nextjs", "frameworks/tailwind"]
     if any(tag in ui_frameworks for tag in tags):
-        content.append(load_rule_block("patterns", "atomic-design"))
+        blocks.append(("patterns", "atomic-design"))
 
     # 3. Stack Rules
     for tag in tags:
         category, name = tag.split("/")
-        content.append(load_rule_block(category, name))
+        blocks.append((category, name))
+
+    return blocks
 
-    # Write output
-    final_output = "\n\n".join([c for c in content if c.strip()])
+def iter_compiled_rule_blocks(
+    blocks: List[Tuple[str, str]],
+    rules_dir: Path,
+    search_paths: List[Path],
+    dependencies: Dependencies,
+    library: Optional[Mapping[Path, str]] = None,
+) -> Iterator[str]:
+    """Expand rule blocks one at a time, each preceded by a blank line.
+
+    Blocks come from library when given; otherwise all block files are read
+    up front in parallel. Only one expanded block is held at a time. Paths
+    read are added to dependencies.
+    """
+    paths = [get_rule_block_path(category, name, rules_dir) for category, name in blocks]
+    engine = get_engine(search_paths)
+    for path in paths:
+        # Library files were stamped when read and preloaded; the rest are read below
+        dependencies.setdefault(path, engine.stamp(path))
+    if library is not None:
+        contents: Iterator[str] = (
+            library[path] if path in library else read_rule_block(path) for path in paths
+        )
+    else:
+        contents = load_rule_blocks(paths)
+    for block in contents:
+        if not block.strip():
+            continue
+        yield "\n\n"
+        # Process embeds (allow blocks to reference other blocks)
+        yield process_template(block, search_paths, dependencies=dependencies)
 
-    # Process embeds (allow blocks to reference other blocks)
+def iter_rules_body(
+    role: str, tags: List[str], library: Optional[Mapping[Path, str]] = None
+) -> Iterator[str]:
+    """Stream the compiled rule blocks for role and tags, reusing .forge/cache when nothing changed."""
     rules_dir = get_rules_dir()
-    search_paths = [rules_dir]
-    # Add subdirectories to search paths
-    for item in rules_dir.iterdir():
-        if item.is_dir():
-            search_paths.append(item)
+    search_paths = get_rule_search_paths(rules_dir)
+    blocks = resolve_rule_blocks(role, tags)
+
+    cache = CompileCache()
+    key = json.dumps(["rules", str(rules_dir), blocks, [str(p) for p in search_paths]])
+    cached = cache.get_path(key)
+    if cached is not None:
+        with open(cached, "r", encoding="utf-8") as f:
+            yield from iter(lambda: f.read(STREAM_CHUNK_SIZE), "")
+        return
+
+    dependencies = Dependencies(search_paths)
+    compiled = iter_compiled_rule_blocks(blocks, rules_dir, search_paths, dependencies, library)
+    yield from cache.record(key, compiled, dependencies)
+
+def write_rules(
+    outputs: List[Path],
+    header: str,
+    role: str,
+    tags: List[str],
+    library: Optional[Mapping[Path, str]] = None,
+) -> None:
+    """Write header and compiled rules to every output incrementally, replacing each atomically."""
+    with ExitStack() as stack:
+        files = [stack.enter_context(atomic_writer(output)) for output in outputs]
+        for f in files:
+            f.write(header)
+        for chunk in iter_rules_body(role, tags, library):
+            for f in files:
+                f.write(chunk)
+
+def discover_projects(root: Path) -> List[Path]:
+    """Find root and every directory below it that has a Python or Node manifest."""
+    markers = set(PYTHON_MANIFESTS + NODE_MANIFESTS)
+    projects = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames if not d.startswith(".") and d not in WORKSPACE_SKIP_DIRS
+        )
+        if markers.intersection(filenames):
+            projects.append(Path(dirpath))
+    return projects
+
+_worker_library: Optional[Dict[Path, str]] = None
+
+def _init_workspace_worker(library: Dict[Path, str], stamps: Dict[Path, Stamp]) -> None:
+    global _worker_library
+    _worker_library = library
+    rules_dir = get_rules_dir()
+    get_engine(get_rule_search_paths(rules_dir)).preload(library, stamps)
+
+def _write_workspace_group(outputs: List[Path], header: str, role: str, tags: List[str]) -> List[Path]:
+    write_rules(outputs, header, role, tags, _worker_library)
+    return outputs
+
+def compile_workspace(
+    root: Path,
+    output: Path,
+    header: str,
+    role: str,
+    tags: Optional[List[str]],
+    jobs: Optional[int] = None,
+) -> Iterator[Tuple[Path, List[str]]]:
+    """Compile rules for every sub-project of root, yielding (output, tags) as files are written.
+
+    Projects with the same tags share one compiled body, and the rules library
+    is read once and handed to each worker process.
+    """
+    groups: Dict[Tuple[str, ...], List[Path]] = {}
+    for project in discover_projects(root):
+        project_tags = tags if tags is not None else detect_stack(project)
+        groups.setdefault(tuple(project_tags), []).append(project / output)
+    if not groups:
+        return
+
+    library, stamps = load_rules_library(get_rules_dir())
+    workers = min(jobs or os.cpu_count() or 1, len(groups))
+    if workers <= 1:
+        _init_workspace_worker(library, stamps)
+        for group_tags, outputs in groups.items():
+            _write_workspace_group(outputs, header, role, list(group_tags))
+            for path in outputs:
+                yield path, list(group_tags)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_workspace_worker, initargs=(library, stamps)
+    ) as pool:
+        futures = {
+            pool.submit(_write_workspace_group, outputs, header, role, list(group_tags)): group_tags
+            for group_tags, outputs in groups.items()
+        }
+        for future, group_tags in futures.items():
+            for path in future.result():
+                yield path, list(group_tags)
+
+@app.command()
+def compile(
+    output: Path = Path(".cursorrules"),
+    role: str = "developer",
+    tags: Optional[List[str]] = None,
+    workspace: bool = typer.Option(
+        False, "--workspace", help="Compile for every sub-project below the current directory"
+    ),
+    jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Worker processes for --workspace"),
+):
+    """
+    Compile a .cursorrules file from the rules library.
+    """
+    # 0. Phase Context (from state.json)
+    state = load_state()
+    header = f"<!-- Context: Phase={state.phase.value}, Status={state.status.value} -->"
+
+    if workspace:
+        if output.is_absolute():
+            raise typer.BadParameter("--output must be relative in --workspace mode", param_hint="--output")
+        root = Path.cwd()
+        for path, project_tags in compile_workspace(root, output, header, role, tags, jobs):
+            print(f"Generated {path.relative_to(root)} (tags: {project_tags})")
+        return
 
-    final_output = process_template(final_output, search_paths)
+    if tags is None:
+        tags = detect_stack(Path.cwd())
+
+    print(f"Detected tags: {tags}")
 
-    output.write_text(final_output)
+    # 1-3. Role, core and stack rules, streamed block by block
+    write_rules([output], header, role, tags)
     print(f"Generated {output}")
 
 if __name__ == "__main__":
@@ -1,16 +1,19 @@
 import os
 import subprocess
 import shutil
-import ssl
 from typing import Optional
-import httpx
-import truststore
 from forge.config import CLAUDE_LOCAL_PATH
+# The HTTP client and TLS context live in forge.http; re-exported for existing imports
+from forge.http import get_client, get_ssl_context
 from forge.logging import console, StepTracker
 
-# Initialize SSL/Client
-ssl_context = truststore.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-client = httpx.Client(verify=ssl_context)
+def __getattr__(name: str):
+    # Backwards compatible module attributes, built lazily
+    if name == "client":
+        return get_client()
+    if name == "ssl_context":
+        return get_ssl_context()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def _github_token(cli_token: str | None = None) -> str | None:
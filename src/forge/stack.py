@@ -0,0 +1,275 @@
+import json
+import re
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from forge.cache import CompileCache, Dependencies
+
+# Package name -> rule tag, in the order tags are reported
+PYTHON_TAGS = [
+    ("fastapi", "frameworks/fastapi"),
+    ("django", "frameworks/django"),
+]
+NODE_TAGS = [
+    ("typescript", "languages/typescript"),
+    ("next", "frameworks/nextjs"),
+    ("react", "frameworks/react"),
+    ("tailwindcss", "frameworks/tailwind"),
+]
+
+# Lockfiles are only read when the directory has no manifest declaring the
+# direct dependencies; they are large and list transitive packages too.
+PYTHON_MANIFESTS = ("pyproject.toml", "requirements.txt", "Pipfile")
+PYTHON_LOCKFILES = ("uv.lock", "Pipfile.lock", "poetry.lock")
+NODE_MANIFESTS = ("package.json",)
+NODE_LOCKFILES = ("package-lock.json", "yarn.lock", "pnpm-lock.yaml")
+_MANIFEST_NAMES = frozenset(
+    PYTHON_MANIFESTS + PYTHON_LOCKFILES + NODE_MANIFESTS + NODE_LOCKFILES
+    + ("pnpm-workspace.yaml", "tsconfig.json")
+)
+
+_REQUIREMENT_NAME = re.compile(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+def normalize_package_name(name: str) -> str:
+    """Normalize a package name (PEP 503 style, also fine for npm names)."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+def requirement_name(spec: str) -> Optional[str]:
+    """Return the package name of a PEP 508 requirement string, if it has one."""
+    match = _REQUIREMENT_NAME.match(spec)
+    return normalize_package_name(match.group(1)) if match else None
+
+@dataclass
+class StackScan:
+    """Everything learned about a project tree while scanning its manifests."""
+    python: bool = False
+    node: bool = False
+    python_packages: Set[str] = field(default_factory=set)
+    node_packages: Set[str] = field(default_factory=set)
+    # Files read and directories listed, stamped before reading; the cached
+    # result depends on them.
+    dependencies: Dependencies = field(default_factory=Dependencies)
+
+    def tags(self) -> List[str]:
+        tags = []
+        if self.python:
+            tags.append("languages/python")
+            tags.extend(tag for name, tag in PYTHON_TAGS if name in self.python_packages)
+        if self.node:
+            tags.extend(tag for name, tag in NODE_TAGS if name in self.node_packages)
+        return tags
+
+def _load_toml(path: Path) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+def _load_json(path: Path) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def _requirement_names(specs: Iterable[Any]) -> Set[str]:
+    names = set()
+    for spec in specs:
+        if isinstance(spec, str):
+            name = requirement_name(spec)
+            if name:
+                names.add(name)
+    return names
+
+def parse_pyproject(path: Path) -> Tuple[Set[str], List[str]]:
+    """Return (dependency names, uv workspace member globs) declared in pyproject.toml."""
+    data = _load_toml(path)
+    project = data.get("project", {})
+    names = _requirement_names(project.get("dependencies", []))
+    for extra in project.get("optional-dependencies", {}).values():
+        names |= _requirement_names(extra)
+    for group in data.get("dependency-groups", {}).values():
+        names |= _requirement_names(group)
+
+    poetry = data.get("tool", {}).get("poetry", {})
+    poetry_tables = [poetry.get("dependencies", {}), poetry.get("dev-dependencies", {})]
+    poetry_tables += [g.get("dependencies", {}) for g in poetry.get("group", {}).values()]
+    for table in poetry_tables:
+        names |= {normalize_package_name(name) for name in table}
+
+    members = data.get("tool", {}).get("uv", {}).get("workspace", {}).get("members", [])
+    return names, list(members)
+
+def parse_requirements(path: Path, seen: Optional[Set[Path]] = None) -> Tuple[Set[str], Set[Path]]:
+    """Return (package names, files read) for a requirements file, following -r includes."""
+    seen = seen if seen is not None else set()
+    seen.add(path)
+    names = set()
+    for line in path.read_text(encoding="utf-8", errors="ignore").splitlines():
+        line = line.split(" #", 1)[0].strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith(("-r ", "--requirement ")):
+            included = path.parent / line.split(None, 1)[1].strip()
+            if included not in seen and included.is_file():
+                names |= parse_requirements(included, seen)[0]
+            continue
+        if line.startswith("-") or "://" in line:
+            continue
+        name = requirement_name(line)
+        if name:
+            names.add(name)
+    return names, seen
+
+def parse_pipfile(path: Path) -> Set[str]:
+    data = _load_toml(path)
+    return {
+        normalize_package_name(name)
+        for table in ("packages", "dev-packages")
+        for name in data.get(table, {})
+    }
+
+def parse_package_json(path: Path) -> Tuple[Set[str], List[str]]:
+    """Return (dependency names, workspace globs) declared in package.json."""
+    data = _load_json(path)
+    names = set()
+    for table in ("dependencies", "devDependencies", "peerDependencies", "optionalDependencies"):
+        names |= set(data.get(table) or {})
+    workspaces = data.get("workspaces") or []
+    if isinstance(workspaces, dict):
+        workspaces = workspaces.get("packages") or []
+    return names, [w for w in workspaces if isinstance(w, str)]
+
+def parse_pnpm_workspace(path: Path) -> List[str]:
+    """Read the packages list of pnpm-workspace.yaml (a flat YAML list)."""
+    globs = []
+    in_packages = False
+    for line in path.read_text(encoding="utf-8").splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if not line[0].isspace():
+            in_packages = stripped.startswith("packages:")
+        elif in_packages and stripped.startswith("-"):
+            globs.append(stripped[1:].strip().strip("'\""))
+    return globs
+
+def _python_lock_names(path: Path) -> Set[str]:
+    if path.name == "Pipfile.lock":
+        data = _load_json(path)
+        return {normalize_package_name(n) for t in ("default", "develop") for n in data.get(t, {})}
+    data = _load_toml(path)
+    packages = data.get("package", [])
+    if path.name == "uv.lock":
+        # Direct dependencies of the workspace root(s) only
+        roots = [p for p in packages if {"editable", "virtual"} & set(p.get("source", {}))]
+        if roots:
+            return {
+                normalize_package_name(dep["name"])
+                for root in roots
+                for dep in root.get("dependencies", [])
+            }
+    return {normalize_package_name(p["name"]) for p in packages if "name" in p}
+
+def _node_lock_names(path: Path) -> Set[str]:
+    if path.name != "package-lock.json":
+        # yarn.lock / pnpm-lock.yaml only tell us this is a Node project
+        return set()
+    data = _load_json(path)
+    root = data.get("packages", {}).get("")
+    if root is not None:
+        return {
+            name
+            for table in ("dependencies", "devDependencies", "optionalDependencies")
+            for name in root.get(table) or {}
+        }
+    return set(data.get("dependencies") or {})
+
+def _expand_members(root: Path, globs: Iterable[str]) -> List[Path]:
+    members = []
+    for pattern in globs:
+        # Members live inside the workspace: skip absolute paths along with
+        # other malformed entries
+        if not isinstance(pattern, str) or not pattern or pattern.startswith(("!", "/", "\\")):
+            continue
+        try:
+            matches = sorted(root.glob(pattern.rstrip("/")))
+        except (ValueError, NotImplementedError):
+            # Invalid or non-relative pattern, e.g. "C:/dev/*" or "a**"
+            continue
+        members.extend(p for p in matches if p.is_dir())
+    return members
+
+def scan_project(project_path: Path, scan: Optional[StackScan] = None, _visited: Optional[Set[Path]] = None) -> StackScan:
+    """Scan manifests in project_path and, recursively, its workspace members."""
+    scan = scan or StackScan()
+    visited = _visited if _visited is not None else set()
+    resolved = project_path.resolve()
+    if resolved in visited:
+        return scan
+    visited.add(resolved)
+
+    # One directory listing answers every "does this manifest exist" question.
+    scan.dependencies.add(project_path)
+    try:
+        present = {p.name for p in project_path.iterdir() if p.is_file()}
+    except OSError:
+        return scan
+
+    members: List[str] = []
+    python_declared = any(m in present for m in PYTHON_MANIFESTS)
+    node_declared = any(m in present for m in NODE_MANIFESTS)
+    scan.python = scan.python or python_declared
+    scan.node = scan.node or node_declared or "tsconfig.json" in present
+
+    for name in sorted(present & _MANIFEST_NAMES):
+        path = project_path / name
+        scan.dependencies.add(path)
+        try:
+            if name == "pyproject.toml":
+                names, uv_members = parse_pyproject(path)
+                scan.python_packages |= names
+                members += uv_members
+            elif name == "requirements.txt":
+                names, files = parse_requirements(path)
+                scan.dependencies.add_all(files)
+                scan.python_packages |= names
+            elif name == "Pipfile":
+                scan.python_packages |= parse_pipfile(path)
+            elif name == "package.json":
+                names, workspaces = parse_package_json(path)
+                scan.node_packages |= names
+                members += workspaces
+            elif name == "pnpm-workspace.yaml":
+                members += parse_pnpm_workspace(path)
+            elif name == "tsconfig.json":
+                scan.node_packages.add("typescript")
+            elif name in PYTHON_LOCKFILES:
+                scan.python = True
+                if not python_declared:
+                    scan.python_packages |= _python_lock_names(path)
+            elif name in NODE_LOCKFILES:
+                scan.node = True
+                if not node_declared:
+                    scan.node_packages |= _node_lock_names(path)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            # A malformed manifest still tells us which ecosystem this is
+            continue
+
+    for member in _expand_members(project_path, members):
+        scan_project(member, scan, visited)
+    return scan
+
+def detect_stack(project_path: Path) -> List[str]:
+    """Auto-detect the tech stack from project manifests, lockfiles and workspaces.
+
+    The result is cached in .forge/cache and reused until a manifest changes or
+    one appears in a scanned directory.
+    """
+    cache = CompileCache()
+    key = json.dumps(["stack", str(project_path.resolve())])
+    cached = cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+
+    scan = scan_project(project_path)
+    tags = scan.tags()
+    cache.put(key, json.dumps(tags), scan.dependencies)
+    return tags
@@ -1,48 +1,472 @@
 import json
+import os
+import random
+import re
+import time
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
-from forge.models import FeatureState, Phase, Status
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from forge.filesystem import atomic_writer, file_lock
+from forge.project import FORGE_DIR, find_project_root
+from forge.models import FeatureState, Phase, QualityGate, Status, Task, to_phase, to_status
 
 STATE_FILE_NAME = "state.json"
-FORGE_DIR = ".forge"
+JOURNAL_FILE_NAME = "journal.jsonl"
+STATE_DB_NAME = "state.db"
+LOCK_FILE_NAME = "state.lock"
+FEATURES_DIR = "features"
+FEATURE_INDEX_NAME = "index.json"
+FEATURE_LOCK_NAME = "index.lock"
+
+# update_state gives up after this many conflicting attempts
+UPDATE_RETRIES = 20
+
+# The journal is folded into state.json once it grows past this many bytes
+JOURNAL_COMPACT_BYTES = 256 * 1024
+
+# Task fields that update_task may change
+TASK_FIELDS = ("description", "status", "file_path", "test_file")
+
+# Bytes read from the end of the journal to find the last sequence number
+JOURNAL_TAIL_BYTES = 1 << 16
+
+# state.json path -> (inode, size, mtime) stamp and parsed contents; treat as read-only
+_snapshots: Dict[Path, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+
+class StateConflictError(Exception):
+    """Raised when saving a state that another writer has changed since it was loaded."""
 
 def get_forge_path() -> Path:
     """Get the path to the .forge directory in the current project."""
-    # Assuming CWD is project root.
-    # In a real scenario we might want to traverse up to find it.
-    return Path.cwd() / FORGE_DIR
+    return find_project_root() / FORGE_DIR
+
+def compact_state_enabled() -> bool:
+    """Return True when FORGE_STATE_COMPACT asks for unindented state.json snapshots."""
+    return os.getenv("FORGE_STATE_COMPACT", "").strip() not in ("", "0")
 
 def get_state_path() -> Path:
     """Get the path to the state file."""
     return get_forge_path() / STATE_FILE_NAME
 
-def load_state() -> FeatureState:
-    """Load the current workflow state. If not found, returns a default state."""
-    state_path = get_state_path()
-    if not state_path.exists():
-        return FeatureState(name="Project")
+def index_tasks(state: FeatureState) -> Dict[str, Task]:
+    """Map task ids to state's tasks; the first task wins if an id repeats."""
+    return {task.id: task for task in reversed(state.tasks)}
+
+def apply_journal_entry(
+    state: FeatureState, entry: Dict[str, Any], tasks: Optional[Dict[str, Task]] = None
+) -> None:
+    """Apply one journaled transition to state in place.
+
+    tasks is index_tasks(state), kept up to date here; pass it when applying
+    many entries so each task lookup is a dict hit instead of a scan.
+    """
+    op = entry.get("op")
+    if op == "phase":
+        state.phase = to_phase(entry["phase"])
+    elif op == "status":
+        state.status = to_status(entry["status"])
+    elif op == "task":
+        fields = dict(entry.get("set", {}))
+        if "status" in fields:
+            fields["status"] = to_status(fields["status"])
+        if tasks is None:
+            tasks = index_tasks(state)
+        task = tasks.get(entry["id"])
+        if task is not None:
+            for name, value in fields.items():
+                setattr(task, name, value)
+        else:
+            fields.setdefault("description", "")
+            task = Task(id=entry["id"], **fields)
+            state.tasks.append(task)
+            tasks[task.id] = task
+    elif op == "gate":
+        state.quality_gates.append(QualityGate.from_dict(entry["gate"]))
+    else:
+        # Checkpoint markers and unknown (newer) operations change nothing
+        return
+    if "at" in entry:
+        state.updated_at = entry["at"]
+
+class StateStore:
+    """
+    Crash-safe storage for the workflow state of one .forge directory.
+
+    state.json is a snapshot that is only ever replaced atomically. Transitions
+    are appended to journal.jsonl as one JSON line each, so recording one costs
+    a single small append instead of a full rewrite. Every journal line carries
+    a sequence number, and the snapshot remembers the last one folded into it
+    ("journal_seq"); loading replays only the newer lines. Once the journal
+    grows past JOURNAL_COMPACT_BYTES it is compacted into a fresh snapshot.
+
+    Writers hold an exclusive flock on state.lock, so parallel processes never
+    interleave. The newest sequence number doubles as the state's version.
+    """
+
+    def __init__(self, forge_path: Optional[Path] = None, compact: Optional[bool] = None):
+        self.forge_path = forge_path or get_forge_path()
+        # Compact (unindented) snapshots are smaller and faster to write and parse
+        self.compact_json = compact if compact is not None else compact_state_enabled()
+        self.state_path = self.forge_path / STATE_FILE_NAME
+        self.journal_path = self.forge_path / JOURNAL_FILE_NAME
+
+    def _read_snapshot(self) -> Optional[Dict[str, Any]]:
+        # Snapshots are replaced atomically, so an unchanged inode, size and
+        # mtime means the parsed copy is still current. This matters in a
+        # long-running process (forge serve) that loads the same state often.
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                st = os.fstat(f.fileno())
+                stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+                cached = _snapshots.get(self.state_path)
+                if cached is not None and cached[0] == stamp:
+                    return cached[1]
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        _snapshots[self.state_path] = (stamp, data)
+        return data
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A line torn by a crash mid-append is never replayed
+                continue
+        return entries
+
+    def lock(self, shared: bool = False):
+        """Advisory lock serializing writers of this store (readers take it shared)."""
+        return file_lock(self.forge_path / LOCK_FILE_NAME, shared=shared)
+
+    def load(self) -> FeatureState:
+        """Load the snapshot and replay journaled transitions recorded after it."""
+        if not self.forge_path.is_dir():
+            return FeatureState(name="Project")
+        # Shared: a compaction swaps both files, which must not happen between the two reads
+        with self.lock(shared=True):
+            return self._load()
+
+    def _load(self) -> FeatureState:
+        try:
+            data = self._read_snapshot()
+            state = FeatureState.from_dict(data) if data is not None else FeatureState(name="Project")
+        except (ValueError, KeyError, TypeError, AttributeError):
+            # Fallback if state is corrupted
+            return FeatureState(name="Project", status=Status.FAILED)
+        applied = data.get("journal_seq", 0) if data is not None else 0
+        state.version = applied
+        tasks = index_tasks(state)
+        for entry in self._read_journal():
+            try:
+                seq = entry.get("seq", 0)
+                if seq > applied:
+                    apply_journal_entry(state, entry, tasks)
+                    state.version = max(state.version, seq)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                # Skip entries this version cannot apply rather than losing the rest
+                continue
+        return state
+
+    def _last_seq(self) -> int:
+        """Sequence number of the newest journal line, read from the end of the file."""
+        try:
+            with open(self.journal_path, "rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                f.seek(max(0, size - JOURNAL_TAIL_BYTES))
+                tail = f.read()
+        except FileNotFoundError:
+            tail = b""
+        for line in reversed(tail.splitlines()):
+            try:
+                return json.loads(line)["seq"]
+            except (ValueError, KeyError, TypeError):
+                continue
+        if len(tail) >= JOURNAL_TAIL_BYTES:
+            entries = self._read_journal()
+            if entries:
+                return max(entry.get("seq", 0) for entry in entries)
+        # Empty or missing journal: continue from the snapshot
+        try:
+            data = self._read_snapshot()
+            return data.get("journal_seq", 0) if data is not None else 0
+        except (ValueError, AttributeError):
+            return 0
+
+    def append(self, op: str, **fields: Any) -> Dict[str, Any]:
+        """Durably record one transition and return the journal entry written."""
+        self.forge_path.mkdir(parents=True, exist_ok=True)
+        with self.lock():
+            entry = {"seq": self._last_seq() + 1, "op": op, **fields}
+            line = json.dumps(entry) + "\n"
+            fd = os.open(self.journal_path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+            try:
+                size = os.fstat(fd).st_size
+                if size:
+                    # Start on a fresh line if a previous append was torn
+                    os.lseek(fd, -1, os.SEEK_END)
+                    if os.read(fd, 1) != b"\n":
+                        line = "\n" + line
+                os.write(fd, line.encode("utf-8"))
+                os.fsync(fd)
+                size += len(line)
+            finally:
+                os.close(fd)
+            if size > JOURNAL_COMPACT_BYTES:
+                self._save(self._load(), entry["seq"])
+        return entry
+
+    def save(self, state: FeatureState, expected_version: Optional[int] = None) -> None:
+        """Replace the snapshot with state and drop the journal it supersedes.
+
+        With expected_version, the write only happens if nothing else has been
+        written since state was loaded at that version; otherwise
+        StateConflictError is raised. On success state.version is bumped.
+        """
+        self.forge_path.mkdir(parents=True, exist_ok=True)
+        with self.lock():
+            current = self._last_seq()
+            if expected_version is not None and expected_version != current:
+                raise StateConflictError(
+                    f"State in {self.forge_path} changed (version {current}, expected {expected_version})"
+                )
+            self._save(state, current + 1)
+            state.version = current + 1
+
+    def _save(self, state: FeatureState, seq: int) -> None:
+        data = state.to_dict()
+        data["version"] = seq
+        data["journal_seq"] = seq
+        if self.compact_json:
+            text = json.dumps(data, separators=(",", ":"))
+        else:
+            text = json.dumps(data, indent=2)
+        with atomic_writer(self.state_path) as f:
+            f.write(text)
+        # A crash before this point only leaves lines the snapshot already covers.
+        # The checkpoint line keeps the sequence going after the reset.
+        with atomic_writer(self.journal_path) as f:
+            f.write(json.dumps({"seq": seq, "op": "checkpoint"}) + "\n")
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot."""
+        with self.lock():
+            self._save(self._load(), self._last_seq())
+
+    def query_tasks(self, status: Optional[Status] = None, file_path: Optional[str] = None) -> List[Task]:
+        """Return tasks matching every given filter, in creation order."""
+        return [
+            task
+            for task in self.load().tasks
+            if (status is None or task.status == status) and (file_path is None or task.file_path == file_path)
+        ]
 
+    def latest_quality_gate(self, name: str) -> Optional[QualityGate]:
+        """Return the most recent result recorded for a gate, or None."""
+        matches = [gate for gate in self.load().quality_gates if gate.name == name]
+        return matches[-1] if matches else None
+
+def get_state_store(forge_path: Optional[Path] = None):
+    """Get the state store of the current project.
+
+    Projects that have a state.db (see migrate_state) use the SQLite backend.
+    """
+    forge_path = forge_path or get_forge_path()
+    if (forge_path / STATE_DB_NAME).exists():
+        from forge.state_sqlite import SqliteStateStore
+        return SqliteStateStore(forge_path)
+    return StateStore(forge_path)
+
+def _remove_database(db_path: Path) -> None:
+    for suffix in ("", "-wal", "-shm"):
+        db_path.with_name(db_path.name + suffix).unlink(missing_ok=True)
+
+def migrate_state(backend: str, forge_path: Optional[Path] = None) -> Path:
+    """Move the project state to the "json" or "sqlite" backend; returns the new store's path."""
+    from forge.state_sqlite import SqliteStateStore
+    forge_path = forge_path or get_forge_path()
+    source = get_state_store(forge_path)
+    state = source.load()
+    if backend == "sqlite":
+        if isinstance(source, SqliteStateStore):
+            return source.db_path
+        target = SqliteStateStore(forge_path)
+        # state.db takes over from state.json as soon as it exists, so it is
+        # built under another name and only renamed once complete
+        staging = SqliteStateStore(forge_path, forge_path / f".{STATE_DB_NAME}.tmp")
+        _remove_database(staging.db_path)
+        try:
+            # Closing the last connection checkpoints the WAL into the file
+            staging.save(state)
+            os.replace(staging.db_path, target.db_path)
+        finally:
+            _remove_database(staging.db_path)
+        # Keep the old snapshot around, but out of the way
+        if source.state_path.exists():
+            source.state_path.replace(forge_path / (STATE_FILE_NAME + ".bak"))
+        source.journal_path.unlink(missing_ok=True)
+        return target.db_path
+    if backend == "json":
+        if not isinstance(source, SqliteStateStore):
+            return source.state_path
+        target = StateStore(forge_path)
+        target.save(state)
+        _remove_database(forge_path / STATE_DB_NAME)
+        return target.state_path
+    raise ValueError(f"Unknown state backend: {backend}")
+
+def slugify(name: str) -> str:
+    """Turn a feature name into its directory name, e.g. "User Auth" -> "user-auth"."""
+    slug = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+    if not slug:
+        raise ValueError(f"Feature name has no usable characters: {name!r}")
+    return slug
+
+def get_features_path() -> Path:
+    """Get the directory holding one state shard per feature."""
+    return get_forge_path() / FEATURES_DIR
+
+def get_feature_index_path() -> Path:
+    return get_features_path() / FEATURE_INDEX_NAME
+
+def load_feature_index() -> Dict[str, Any]:
+    """Load the feature index: {"active": slug or None, "features": {slug: {"name", "created_at"}}}."""
     try:
-        with open(state_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return FeatureState.from_dict(data)
-    except (json.JSONDecodeError, KeyError):
-        # Fallback if state is corrupted
-        return FeatureState(name="Project", status=Status.FAILED)
-
-def save_state(state: FeatureState) -> None:
+        with open(get_feature_index_path(), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {"active": None, "features": {}}
+    index.setdefault("active", None)
+    index.setdefault("features", {})
+    return index
+
+def save_feature_index(index: Dict[str, Any]) -> None:
+    path = get_feature_index_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_writer(path) as f:
+        json.dump(index, f, indent=2)
+
+def get_feature_path(feature: Optional[str] = None) -> Path:
+    """Get the .forge directory holding the state of a feature.
+
+    With no feature given, this is the active feature's shard, or the project's
+    .forge directory itself when no feature has been created yet. Naming a
+    feature never reads the index or any other feature.
+    """
+    feature = feature or os.getenv("FORGE_FEATURE") or None
+    if feature is None:
+        feature = load_feature_index()["active"]
+        if feature is None:
+            return get_forge_path()
+    return get_features_path() / slugify(feature)
+
+def feature_exists(feature: str) -> bool:
+    """Return True if the feature is registered in the index (see activate_feature).
+
+    A shard directory alone does not count: writes naming an unknown feature
+    create one without registering it.
+    """
+    return slugify(feature) in load_feature_index()["features"]
+
+def activate_feature(name: str) -> str:
+    """Register a feature (if new) and make it the active one; returns its slug.
+
+    The first feature of a project that already has a single root state takes
+    that state over, so existing tasks carry on under the feature.
+    """
+    slug = slugify(name)
+    with file_lock(get_features_path() / FEATURE_LOCK_NAME):
+        return _activate_feature(name, slug)
+
+def _activate_feature(name: str, slug: str) -> str:
+    index = load_feature_index()
+    feature_path = get_features_path() / slug
+    if slug not in index["features"]:
+        root = get_forge_path()
+        has_root_state = (root / STATE_FILE_NAME).exists() or (root / STATE_DB_NAME).exists()
+        if not index["features"] and has_root_state and not feature_path.exists():
+            state = get_state_store(root).load()
+            state.name = name
+            StateStore(feature_path).save(state)
+        index["features"][slug] = {"name": name, "created_at": datetime.now().isoformat()}
+    index["active"] = slug
+    save_feature_index(index)
+    return slug
+
+def get_feature_store(feature: Optional[str] = None):
+    """Get the state store of a feature (default: the active one)."""
+    return get_state_store(get_feature_path(feature))
+
+def load_state(feature: Optional[str] = None) -> FeatureState:
+    """Load the current workflow state. If not found, returns a default state."""
+    store = get_feature_store(feature)
+    state = store.load()
+    if feature and not store.forge_path.exists():
+        state.name = feature
+    return state
+
+def save_state(state: FeatureState, feature: Optional[str] = None) -> None:
     """Save the workflow state to disk."""
-    state_path = get_state_path()
-    # Ensure .forge exists
-    if not state_path.parent.exists():
-        state_path.parent.mkdir(parents=True, exist_ok=True)
+    get_feature_store(feature).save(state)
 
-    with open(state_path, "w", encoding="utf-8") as f:
-        json.dump(state.to_dict(), f, indent=2)
+def update_state(
+    mutate: Callable[[FeatureState], None], feature: Optional[str] = None, retries: int = UPDATE_RETRIES
+) -> FeatureState:
+    """Apply mutate to the current state and save it, retrying if another writer got there first.
 
-def update_phase(phase: Phase) -> None:
+    mutate may run more than once, each time on freshly loaded state. Returns
+    the state as saved.
+    """
+    store = get_feature_store(feature)
+    for attempt in range(retries):
+        state = store.load()
+        mutate(state)
+        try:
+            store.save(state, expected_version=state.version)
+            return state
+        except StateConflictError:
+            # Back off with jitter so colliding writers spread out
+            time.sleep(random.uniform(0, 0.002 * 2 ** min(attempt, 8)))
+    raise StateConflictError(f"Gave up updating state after {retries} conflicting attempts")
+
+def update_phase(phase: Phase, feature: Optional[str] = None) -> None:
     """Update the current phase in the state."""
-    state = load_state()
-    state.phase = phase
-    state.updated_at = __import__("datetime").datetime.now().isoformat()
-    save_state(state)
+    get_feature_store(feature).append("phase", phase=phase.value, at=datetime.now().isoformat())
+
+def update_task(task_id: str, feature: Optional[str] = None, **fields: Any) -> Dict[str, Any]:
+    """Create or patch one task without rewriting the rest of the state.
+
+    Only the given fields change; a task that does not exist yet is created
+    (with an empty description unless one is given). Returns the journal entry.
+    """
+    unknown = set(fields) - set(TASK_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown task field(s): {', '.join(sorted(unknown))}")
+    if "status" in fields:
+        fields["status"] = Status(fields["status"]).value
+    return get_feature_store(feature).append("task", id=task_id, set=fields, at=datetime.now().isoformat())
+
+def record_quality_gate(
+    name: str, passed: bool, details: Optional[str] = None, feature: Optional[str] = None
+) -> QualityGate:
+    """Append a quality gate result without rewriting the rest of the state."""
+    gate = {"name": name, "passed": passed, "timestamp": datetime.now().isoformat(), "details": details}
+    get_feature_store(feature).append("gate", gate=gate, at=gate["timestamp"])
+    return QualityGate(**gate)
+
+def query_tasks(
+    status: Optional[Status] = None, file_path: Optional[str] = None, feature: Optional[str] = None
+) -> List[Task]:
+    """Return the feature's tasks matching every given filter."""
+    return get_feature_store(feature).query_tasks(status=status, file_path=file_path)
+
+def latest_quality_gate(name: str, feature: Optional[str] = None) -> Optional[QualityGate]:
+    """Return the most recent result recorded for a gate."""
+    return get_feature_store(feature).latest_quality_gate(name)
@@ -0,0 +1,205 @@
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from forge.models import FeatureState, Phase, QualityGate, Status, Task, to_phase, to_status
+from forge.state import STATE_DB_NAME, TASK_FIELDS, StateConflictError, get_forge_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    pos INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT 'pending',
+    file_path TEXT,
+    test_file TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_id ON tasks (id, pos);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status);
+CREATE INDEX IF NOT EXISTS tasks_file_path ON tasks (file_path);
+CREATE TABLE IF NOT EXISTS quality_gates (
+    pos INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    passed INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    details TEXT
+);
+CREATE INDEX IF NOT EXISTS quality_gates_name ON quality_gates (name, pos);
+"""
+
+def _task(row: sqlite3.Row) -> Task:
+    return Task(
+        id=row["id"],
+        description=row["description"],
+        status=to_status(row["status"]),
+        file_path=row["file_path"],
+        test_file=row["test_file"],
+    )
+
+def _gate(row: sqlite3.Row) -> QualityGate:
+    return QualityGate(
+        name=row["name"], passed=bool(row["passed"]), timestamp=row["timestamp"], details=row["details"]
+    )
+
+class SqliteStateStore:
+    """
+    Workflow state kept in .forge/state.db instead of state.json.
+
+    Same interface as StateStore, but tasks and quality gates are rows: a
+    transition touches one row, and status / file path / latest-gate lookups
+    use indexes instead of loading the whole feature. The database runs in
+    WAL mode so readers never block the writer. Every write bumps a version
+    counter in the meta table inside the same transaction.
+    """
+
+    def __init__(self, forge_path: Optional[Path] = None, db_path: Optional[Path] = None):
+        self.forge_path = forge_path or get_forge_path()
+        self.db_path = db_path or self.forge_path / STATE_DB_NAME
+
+    def connect(self) -> sqlite3.Connection:
+        self.forge_path.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def load(self) -> FeatureState:
+        """Load the full state."""
+        with closing(self.connect()) as conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+            tasks = [_task(row) for row in conn.execute("SELECT * FROM tasks ORDER BY pos")]
+            gates = [_gate(row) for row in conn.execute("SELECT * FROM quality_gates ORDER BY pos")]
+        state = FeatureState(name=meta.get("name", "Project"), tasks=tasks, quality_gates=gates)
+        if "phase" in meta:
+            state.phase = to_phase(meta["phase"])
+        if "status" in meta:
+            state.status = to_status(meta["status"])
+        if "artifacts" in meta:
+            state.artifacts = json.loads(meta["artifacts"])
+        for key in ("created_at", "updated_at"):
+            if key in meta:
+                setattr(state, key, meta[key])
+        state.version = int(meta.get("version", 0))
+        return state
+
+    def save(self, state: FeatureState, expected_version: Optional[int] = None) -> None:
+        """Replace the stored state with state in one transaction.
+
+        With expected_version, StateConflictError is raised instead if another
+        write happened since state was loaded. On success state.version is bumped.
+        """
+        with closing(self.connect()) as conn, conn:
+            # Take the write lock before reading the version
+            conn.execute("BEGIN IMMEDIATE")
+            current = self._version(conn)
+            if expected_version is not None and expected_version != current:
+                raise StateConflictError(
+                    f"State in {self.db_path} changed (version {current}, expected {expected_version})"
+                )
+            meta = {
+                "name": state.name,
+                "phase": state.phase.value,
+                "status": state.status.value,
+                "artifacts": json.dumps(state.artifacts),
+                "created_at": state.created_at,
+                "updated_at": state.updated_at,
+                "version": str(current + 1),
+            }
+            conn.execute("DELETE FROM meta")
+            conn.execute("DELETE FROM tasks")
+            conn.execute("DELETE FROM quality_gates")
+            conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", meta.items())
+            conn.executemany(
+                "INSERT INTO tasks (id, description, status, file_path, test_file) VALUES (?, ?, ?, ?, ?)",
+                [(t.id, t.description, to_status(t.status).value, t.file_path, t.test_file) for t in state.tasks],
+            )
+            conn.executemany(
+                "INSERT INTO quality_gates (name, passed, timestamp, details) VALUES (?, ?, ?, ?)",
+                [(g.name, int(g.passed), g.timestamp, g.details) for g in state.quality_gates],
+            )
+        state.version = current + 1
+
+    @staticmethod
+    def _version(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        return int(row[0]) if row is not None else 0
+
+    def append(self, op: str, **fields: Any) -> Dict[str, Any]:
+        """Apply one transition (the same operations StateStore journals) in place."""
+        entry = {"op": op, **fields}
+        with closing(self.connect()) as conn, conn:
+            if op in ("phase", "status"):
+                value = Phase(fields[op]).value if op == "phase" else Status(fields[op]).value
+                self._set_meta(conn, op, value)
+            elif op == "task":
+                self._upsert_task(conn, fields["id"], fields.get("set", {}))
+            elif op == "gate":
+                gate = fields["gate"]
+                conn.execute(
+                    "INSERT INTO quality_gates (name, passed, timestamp, details) VALUES (?, ?, ?, ?)",
+                    (gate["name"], int(gate["passed"]), gate["timestamp"], gate.get("details")),
+                )
+            else:
+                raise ValueError(f"Unknown state operation: {op}")
+            if "at" in fields:
+                self._set_meta(conn, "updated_at", fields["at"])
+            self._set_meta(conn, "version", str(self._version(conn) + 1))
+        return entry
+
+    @staticmethod
+    def _set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value),
+        )
+
+    @staticmethod
+    def _upsert_task(conn: sqlite3.Connection, task_id: str, fields: Dict[str, Any]) -> None:
+        # Column names come from TASK_FIELDS only, never from the caller
+        columns = [name for name in TASK_FIELDS if name in fields]
+        values = {name: fields[name] for name in columns}
+        if "status" in values:
+            values["status"] = Status(values["status"]).value
+        # Ids may repeat, as in state.json; like index_tasks, the first task
+        # wins. The UPDATE also takes the write lock before the INSERT.
+        update = ", ".join(f"{name} = :{name}" for name in columns) or "id = id"
+        updated = conn.execute(
+            f"UPDATE tasks SET {update} WHERE pos = (SELECT MIN(pos) FROM tasks WHERE id = :id)",
+            {"id": task_id, **values},
+        ).rowcount
+        if not updated:
+            insert = {"description": "", "status": Status.PENDING.value, **values}
+            conn.execute(
+                "INSERT INTO tasks (id, description, status, file_path, test_file) "
+                "VALUES (:id, :description, :status, :file_path, :test_file)",
+                {"id": task_id, "file_path": None, "test_file": None, **insert},
+            )
+
+    def query_tasks(self, status: Optional[Status] = None, file_path: Optional[str] = None) -> List[Task]:
+        """Return tasks matching every given filter, in creation order."""
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(Status(status).value)
+        if file_path is not None:
+            clauses.append("file_path = ?")
+            params.append(file_path)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with closing(self.connect()) as conn:
+            rows = conn.execute(f"SELECT * FROM tasks{where} ORDER BY pos", params).fetchall()
+        return [_task(row) for row in rows]
+
+    def latest_quality_gate(self, name: str) -> Optional[QualityGate]:
+        """Return the most recent result recorded for a gate, or None."""
+        with closing(self.connect()) as conn:
+            row = conn.execute(
+                "SELECT * FROM quality_gates WHERE name = ? ORDER BY pos DESC LIMIT 1", (name,)
+            ).fetchone()
+        return _gate(row) if row is not None else None
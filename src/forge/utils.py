@@ -1,6 +1,6 @@
 from forge.logging import console, StepTracker, get_key, select_with_arrows, show_banner
-from forge.shell import client, _github_token, _github_auth_headers, run_command, check_tool, ssl_context
-from forge.filesystem import is_git_repo, init_git_repo, handle_vscode_settings, merge_json_files, ensure_executable_scripts
+from forge.shell import get_client, get_ssl_context, _github_token, _github_auth_headers, run_command, check_tool
+from forge.filesystem import is_git_repo, init_git_repo, handle_vscode_settings, merge_vscode_settings, merge_json_files, ensure_executable_scripts, atomic_writer, file_lock
 
 __all__ = [
     "console",
@@ -10,6 +10,8 @@ __all__ = [
     "show_banner",
     "client",
     "ssl_context",
+    "get_client",
+    "get_ssl_context",
     "_github_token",
     "_github_auth_headers",
     "run_command",
@@ -17,6 +19,16 @@ __all__ = [
     "is_git_repo",
     "init_git_repo",
     "handle_vscode_settings",
+    "merge_vscode_settings",
     "merge_json_files",
     "ensure_executable_scripts",
+    "atomic_writer",
+    "file_lock",
 ]
+
+def __getattr__(name: str):
+    # client / ssl_context are created on first access (see forge.shell)
+    if name in ("client", "ssl_context"):
+        import forge.shell
+        return getattr(forge.shell, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
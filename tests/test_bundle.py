@@ -0,0 +1,96 @@
+import io
+import json
+import os
+import tarfile
+import pytest
+from pathlib import Path
+from typer.testing import CliRunner
+from forge.bundle import MANIFEST_NAME, BundleError, apply_bundle, create_bundle, read_bundle_manifest
+from forge.cli import app
+
+runner = CliRunner()
+
+@pytest.fixture
+def templates(tmp_path):
+    root = tmp_path / "templates"
+    (root / "rules").mkdir(parents=True)
+    (root / "rules" / "base.md").write_text("# Base rules")
+    (root / "plan-template.md").write_text("# Plan")
+    (root / "structure" / ".vscode").mkdir(parents=True)
+    (root / "structure" / ".vscode" / "settings.json").write_text(json.dumps({"editor": {"tabSize": 2}}))
+    script = root / "structure" / "scripts" / "setup.sh"
+    script.parent.mkdir()
+    script.write_text("#!/bin/sh\n")
+    script.chmod(0o755)
+    (root / "claude" / "commands").mkdir(parents=True)
+    (root / "claude" / "commands" / "forge.plan.md").write_text("plan command")
+    # Another agent's files stay out of a claude bundle
+    (root / ".cursor").mkdir()
+    (root / ".cursor" / "rules.md").write_text("cursor")
+    return root
+
+def test_bundle_round_trip(tmp_path, templates):
+    bundle = tmp_path / "out" / "claude.tar.gz"
+    manifest = create_bundle(templates, "claude", bundle, version="1.2.3")
+
+    with tarfile.open(bundle, "r:gz") as tar:
+        assert tar.getnames()[0] == MANIFEST_NAME
+    assert read_bundle_manifest(bundle)["version"] == "1.2.3"
+    assert sorted(entry["path"] for entry in manifest["files"]) == [
+        ".claude/commands/forge.plan.md",
+        ".forge/templates/plan-template.md",
+        ".forge/templates/rules/base.md",
+        ".vscode/settings.json",
+        "scripts/setup.sh",
+    ]
+
+    project = tmp_path / "project"
+    (project / ".vscode").mkdir(parents=True)
+    (project / ".vscode" / "settings.json").write_text(json.dumps({"editor": {"wordWrap": "on"}}))
+    apply_bundle(bundle, project)
+
+    assert (project / ".forge" / "templates" / "rules" / "base.md").read_text() == "# Base rules"
+    assert (project / ".claude" / "commands" / "forge.plan.md").read_text() == "plan command"
+    assert os.stat(project / "scripts" / "setup.sh").st_mode & 0o777 == 0o755
+    assert json.loads((project / ".vscode" / "settings.json").read_text()) == {"editor": {"wordWrap": "on", "tabSize": 2}}
+
+def test_bundle_rejects_tampered_files(tmp_path, templates):
+    bundle = tmp_path / "claude.tar.gz"
+    create_bundle(templates, "claude", bundle)
+    # Rewrite one member while keeping the manifest
+    tampered = tmp_path / "tampered.tar.gz"
+    with tarfile.open(bundle, "r:gz") as src, tarfile.open(tampered, "w:gz") as dst:
+        for member in src.getmembers():
+            data = src.extractfile(member).read()
+            if member.name.endswith("base.md"):
+                data = data.replace(b"Base", b"Evil")
+            dst.addfile(member, io.BytesIO(data))
+
+    project = tmp_path / "project"
+    existing = project / ".forge" / "templates" / "rules" / "base.md"
+    existing.parent.mkdir(parents=True)
+    existing.write_text("# My rules")
+
+    with pytest.raises(BundleError, match="Checksum mismatch"):
+        apply_bundle(tampered, project)
+    # The file the tampered member would have replaced is untouched
+    assert existing.read_text() == "# My rules"
+    assert [p.name for p in existing.parent.iterdir()] == ["base.md"]
+
+def test_bundle_cli_and_init(tmp_path, templates, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    result = runner.invoke(app, ["bundle", "create", "--ai", "claude", "--templates", str(templates)])
+    assert result.exit_code == 0, result.stdout
+    assert (tmp_path / "forge-bundle-claude.tar.gz").exists()
+
+    result = runner.invoke(app, [
+        "init", "proj", "--bundle", "forge-bundle-claude.tar.gz", "--script", "sh",
+        "--no-git", "--ignore-agent-tools",
+    ])
+    assert result.exit_code == 0, result.stdout
+    assert (tmp_path / "proj" / ".claude" / "commands" / "forge.plan.md").exists()
+    assert (tmp_path / "proj" / ".forge" / "state.json").exists()
+
+    result = runner.invoke(app, ["init", "other", "--bundle", "forge-bundle-claude.tar.gz", "--ai", "gemini"])
+    assert result.exit_code != 0
+    assert "is for 'claude'" in result.stdout
@@ -0,0 +1,82 @@
+import os
+from pathlib import Path
+from typer.testing import CliRunner
+from forge.cli import app
+from forge.cache import CompileCache, Dependencies
+
+runner = CliRunner()
+
+def test_cache_roundtrip_and_invalidation(tmp_path):
+    block = tmp_path / "block.md"
+    block.write_text("v1")
+    cache = CompileCache(tmp_path / "cache")
+
+    assert cache.get("k") is None
+    cache.put("k", "compiled v1", [block])
+    assert cache.get("k") == "compiled v1"
+
+    # Same size, new content and mtime: the hash catches it.
+    block.write_text("v2")
+    os.utime(block, ns=(0, 0))
+    assert cache.get("k") is None
+
+def test_cache_tracks_missing_dependencies(tmp_path):
+    missing = tmp_path / "later.md"
+    cache = CompileCache(tmp_path / "cache")
+    cache.put("k", "out", [missing])
+    assert cache.get("k") == "out"
+
+    missing.write_text("now here")
+    assert cache.get("k") is None
+
+def test_cache_ignores_edits_made_while_compiling(tmp_path):
+    block = tmp_path / "block.md"
+    block.write_text("v1")
+    cache = CompileCache(tmp_path / "cache")
+
+    # Stamped before reading, then edited before the output is stored
+    dependencies = Dependencies([block])
+    compiled = "compiled " + block.read_text()
+    block.write_text("v2")
+    os.utime(block, ns=(10**9, 10**9))
+    cache.put("k", compiled, dependencies)
+
+    assert cache.get("k") is None
+
+def test_cache_disabled_by_env(tmp_path, monkeypatch):
+    cache = CompileCache(tmp_path / "cache")
+    cache.put("k", "out", [])
+    monkeypatch.setenv("FORGE_NO_CACHE", "1")
+    assert cache.get("k") is None
+
+def test_rules_compile_warm_cache_skips_templates(tmp_path, mocker):
+    rules_dir = tmp_path / "templates" / "rules"
+    (rules_dir / "roles").mkdir(parents=True)
+    (rules_dir / "roles" / "developer.md").write_text("Role: Developer")
+    mocker.patch("forge.rules.get_rules_dir", return_value=rules_dir)
+
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        Path(".forge").mkdir()
+        assert runner.invoke(app, ["rules", "compile"]).exit_code == 0
+        process = mocker.patch("forge.rules.process_template")
+
+        result = runner.invoke(app, ["rules", "compile"])
+        assert result.exit_code == 0
+        process.assert_not_called()
+        assert "Role: Developer" in Path(".cursorrules").read_text()
+
+        (rules_dir / "roles" / "developer.md").write_text("Role: Reviewer")
+        process.side_effect = lambda content, *args, **kwargs: content
+        runner.invoke(app, ["rules", "compile"])
+        assert "Role: Reviewer" in Path(".cursorrules").read_text()
+
+def test_rules_compile_outside_a_project_creates_no_forge_dir(tmp_path, mocker):
+    rules_dir = tmp_path / "templates" / "rules"
+    (rules_dir / "roles").mkdir(parents=True)
+    (rules_dir / "roles" / "developer.md").write_text("Role: Developer")
+    mocker.patch("forge.rules.get_rules_dir", return_value=rules_dir)
+
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        assert runner.invoke(app, ["rules", "compile"]).exit_code == 0
+        assert "Role: Developer" in Path(".cursorrules").read_text()
+        assert not Path(".forge").exists()
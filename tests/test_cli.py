@@ -51,3 +51,41 @@ def test_rules_compile_help():
     result = runner.invoke(app, ["rules", "compile", "--help"])
     assert result.exit_code == 0
     assert "Compile a .cursorrules file" in result.stdout
+
+# Modules that commands without network or interactive I/O must not import
+HEAVY_MODULES = ("httpx", "truststore", "readchar", "rich.live", "ssl", "multiprocessing")
+
+def _import_times(code: str, cwd: Path) -> dict:
+    """Run code under `python -X importtime`; map each imported module to its cumulative microseconds."""
+    import os
+    import subprocess
+    import sys
+    import forge
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(Path(forge.__file__).parents[1]), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, cwd=cwd, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and not line.endswith("imported package"):
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+def test_cli_import_is_lazy(tmp_path):
+    times = _import_times("import forge.cli", tmp_path)
+    assert "forge.cli" in times
+    assert [m for m in HEAVY_MODULES if m in times] == []
+
+def test_offline_commands_skip_network_stack(tmp_path):
+    code = (
+        "from forge.cli import app\n"
+        "app(['rules', 'compile', '--tags', 'languages/python'], standalone_mode=False)\n"
+        "app(['tasks'], standalone_mode=False)\n"
+    )
+    times = _import_times(code, tmp_path)
+    assert (tmp_path / ".cursorrules").exists()
+    assert [m for m in HEAVY_MODULES if m in times] == []
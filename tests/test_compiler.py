@@ -1,6 +1,15 @@
 import pytest
 from pathlib import Path
-from forge.compiler.markdown import process_template, strip_frontmatter
+from forge.compiler.markdown import (
+    SearchPathIndex,
+    TextNode,
+    TransclusionNode,
+    WikiLinkNode,
+    parse_frontmatter,
+    parse_template,
+    process_template,
+    strip_frontmatter,
+)
 
 def test_strip_frontmatter():
     content = "---\ntitle: Test\n---\n# Header"
@@ -9,6 +18,17 @@ def test_strip_frontmatter():
     content_no_fm = "# Header"
     assert strip_frontmatter(content_no_fm) == "# Header"
 
+def test_parse_frontmatter_metadata():
+    content = "---\nname: block\ndescription: \"Use it\"\n---\n\n# Body"
+    frontmatter = parse_frontmatter(content)
+    assert frontmatter.metadata == {"name": "block", "description": "Use it"}
+    assert content[frontmatter.body_offset:] == "# Body"
+
+def test_parse_frontmatter_unclosed_fence_is_body():
+    content = "---\n" + "line\n" * 10_000 + "---\n# Body"
+    assert parse_frontmatter(content).body_offset == 0
+    assert strip_frontmatter("---\nno closing fence") == "---\nno closing fence"
+
 def test_process_template_transclusion(tmp_path):
     # Setup
     templates_dir = tmp_path / "templates"
@@ -48,10 +68,73 @@ def test_process_template_wikilink(tmp_path):
 def test_recursion_limit(tmp_path):
     templates_dir = tmp_path / "templates"
     templates_dir.mkdir()
-    (templates_dir / "loop.md").write_text("![[loop]]")
+    (templates_dir / "a.md").write_text("![[b]]")
+    (templates_dir / "b.md").write_text("![[c]]")
+    (templates_dir / "c.md").write_text("![[d]]")
+    (templates_dir / "d.md").write_text("bottom")
 
-    content = "![[loop]]"
+    content = "![[a]]"
     search_paths = [templates_dir]
 
     result = process_template(content, search_paths, max_depth=2)
     assert "Recursion depth exceeded" in result
+    assert process_template(content, search_paths, max_depth=4) == "bottom"
+
+def test_transclusion_cycle_reports_path(tmp_path, mocker):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "a.md").write_text("A ![[b]]")
+    (templates_dir / "b.md").write_text("B ![[a]]")
+
+    read_text = mocker.spy(Path, "read_text")
+    result = process_template("![[a]]", [templates_dir])
+
+    assert result.startswith("A B <!-- Error: Transclusion cycle detected: ")
+    assert "a.md -> " in result and "b.md -> " in result
+    assert "Recursion depth exceeded" not in result
+    assert read_text.call_count == 2
+
+def test_shared_block_read_once(tmp_path, mocker):
+    templates_dir = tmp_path / "templates"
+    templates_dir.mkdir()
+    (templates_dir / "shared.md").write_text("---\ntitle: Shared\n---\nShared")
+    (templates_dir / "a.md").write_text("A ![[shared]]")
+    (templates_dir / "b.md").write_text("B ![[shared]]")
+
+    read_text = mocker.spy(Path, "read_text")
+    result = process_template("![[a]] ![[b]] ![[shared]]", [templates_dir])
+
+    assert result == "A Shared B Shared Shared"
+    shared_reads = [c for c in read_text.call_args_list if c.args[0].name == "shared.md"]
+    assert len(shared_reads) == 1
+
+def test_search_path_index_priority(tmp_path, mocker):
+    local = tmp_path / ".forge" / "templates" / "blocks"
+    repo = tmp_path / "templates" / "blocks"
+    local.mkdir(parents=True)
+    repo.mkdir(parents=True)
+    (local / "shared.md").write_text("local")
+    (repo / "shared.md").write_text("repo")
+    (repo / "only-repo.md").write_text("repo only")
+    (repo / "sub").mkdir()
+    (repo / "sub" / "nested.md").write_text("nested")
+
+    index = SearchPathIndex([local, repo])
+    exists = mocker.spy(Path, "exists")
+
+    assert index.find("shared") == local / "shared.md"
+    assert index.find("only-repo.md") == repo / "only-repo.md"
+    assert index.find("missing") is None
+    assert exists.call_count == 0
+    assert index.find("sub/nested") == repo / "sub" / "nested.md"
+
+def test_parse_template_single_pass():
+    nodes = parse_template("a ![[ block ]] b [[ref]] [[no\nclose]] [[x ![[embed]]")
+    assert nodes == [
+        TextNode("a "),
+        TransclusionNode("block", "![[ block ]]"),
+        TextNode(" b "),
+        WikiLinkNode("ref"),
+        TextNode(" [[no\nclose]] [[x "),
+        TransclusionNode("embed", "![[embed]]"),
+    ]
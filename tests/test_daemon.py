@@ -0,0 +1,117 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from forge.compiler import markdown
+from forge.compiler.markdown import TemplateEngine, drop_stale_engines
+from forge.daemon import forward, is_running, stop
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+def test_forward_falls_back_without_daemon(tmp_path, monkeypatch):
+    monkeypatch.setenv("FORGE_SOCKET", str(tmp_path / "none.sock"))
+    assert forward(["state", "show"]) is None
+    # Interactive and unknown commands never leave the process
+    assert forward(["init", "demo"]) is None
+    assert forward([]) is None
+
+def start_daemon(sock: Path) -> subprocess.Popen:
+    env = {**os.environ, "PYTHONPATH": str(SRC), "FORGE_SOCKET": str(sock)}
+    daemon = subprocess.Popen(
+        [sys.executable, "-c", "from forge.cli import main; main()", "serve"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(100):
+        if is_running(sock):
+            break
+        time.sleep(0.05)
+    return daemon
+
+def test_forward_round_trip(tmp_path, monkeypatch, capsys):
+    sock = tmp_path / "forge.sock"
+    project = tmp_path / "project"
+    (project / ".forge").mkdir(parents=True)
+    daemon = start_daemon(sock)
+    try:
+        monkeypatch.chdir(project)
+        monkeypatch.setenv("FORGE_SOCKET", str(sock))
+
+        assert forward(["state", "task", "T1", "--description", "Remote task"]) == 0
+        assert forward(["state", "show"]) == 0
+        assert "Remote task" in capsys.readouterr().out
+        # Errors keep their exit code and the daemon keeps serving
+        assert forward(["state", "bogus"]) == 2
+        assert "No such command" in capsys.readouterr().err
+        # The command ran in the client's directory
+        assert "Remote task" in (project / ".forge" / "journal.jsonl").read_text()
+
+        monkeypatch.setenv("FORGE_NO_DAEMON", "1")
+        assert forward(["state", "show"]) is None
+
+        assert stop(sock)
+        daemon.wait(timeout=10)
+        assert not sock.exists()
+    finally:
+        daemon.kill()
+
+def test_forward_distrusts_foreign_or_silent_sockets(tmp_path, monkeypatch, capsys):
+    import socket
+    path = tmp_path / "forge.sock"
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(path))
+    listener.listen()
+    monkeypatch.setenv("FORGE_SOCKET", str(path))
+    monkeypatch.setenv("FORGE_DAEMON_TIMEOUT", "0.2")
+    try:
+        # Open to other users: never connected to
+        path.chmod(0o666)
+        assert not is_running(path)
+        # Accepts but never answers: an error, since the request was delivered
+        path.chmod(0o600)
+        assert is_running(path)
+        assert forward(["state", "show"]) == 1
+        assert "no answer from the daemon" in capsys.readouterr().err
+    finally:
+        listener.close()
+
+def test_timed_out_command_runs_exactly_once(tmp_path):
+    sock = tmp_path / "forge.sock"
+    project = tmp_path / "project"
+    (project / ".forge").mkdir(parents=True)
+    daemon = start_daemon(sock)
+    try:
+        env = {
+            **os.environ, "PYTHONPATH": str(SRC), "FORGE_SOCKET": str(sock),
+            # Far shorter than the daemon takes to run the command
+            "FORGE_DAEMON_TIMEOUT": "0.001",
+        }
+        client = subprocess.run(
+            [sys.executable, "-c", "from forge import main; main()", "state", "gate", "tests", "--passed"],
+            cwd=project, env=env, capture_output=True, text=True,
+        )
+        assert client.returncode == 1
+        assert "no answer from the daemon" in client.stderr
+
+        # Requests are handled in order, so the gate is recorded once stop returns
+        assert stop(sock)
+        daemon.wait(timeout=10)
+        journal = (project / ".forge" / "journal.jsonl").read_text()
+        assert journal.count('"tests"') == 1
+    finally:
+        daemon.kill()
+
+def test_engine_notices_template_edits(tmp_path, monkeypatch):
+    template = tmp_path / "block.md"
+    template.write_text("one", encoding="utf-8")
+    engine = TemplateEngine([tmp_path], tmp_path)
+    engine.load(template)
+    assert not engine.is_stale()
+
+    template.write_text("two", encoding="utf-8")
+    os.utime(template, ns=(0, 0))
+    assert engine.is_stale()
+
+    monkeypatch.setattr(markdown, "_engines", {("key",): engine})
+    drop_stale_engines()
+    assert markdown._engines == {}
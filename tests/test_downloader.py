@@ -0,0 +1,266 @@
+import io
+import json
+import os
+import shutil
+import zipfile
+import httpx
+import pytest
+from pathlib import Path
+from forge.cache import ReleaseCache
+from forge.downloader import download_and_extract_template
+
+ASSET = "forge-kit-template-claude-sh-v1.zip"
+RELEASE_URL = "https://api.github.com/repos/suportesaude/forge/releases/latest"
+ASSET_URL = f"https://github.com/suportesaude/forge/releases/download/v1/{ASSET}"
+
+def make_zip(files: dict, prefix: str = "forge-template/") -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, content in files.items():
+            zf.writestr(prefix + name, content)
+    return buffer.getvalue()
+
+class FakeGitHub:
+    """Serves one release with one asset and records the requests it saw."""
+
+    def __init__(self, archive: bytes):
+        self.archive = archive
+        self.requests = []
+        self.ranges = True
+        # Cut the connection after this many bytes of the next download from the start
+        self.drop_at = None
+        self.digest = None
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if str(request.url) == RELEASE_URL:
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            asset = {"name": ASSET, "size": len(self.archive), "browser_download_url": ASSET_URL}
+            if self.digest:
+                asset["digest"] = self.digest
+            release = {"tag_name": "v1", "assets": [asset]}
+            return httpx.Response(200, json=release, headers={"ETag": '"v1"'})
+        if str(request.url) == ASSET_URL:
+            spec = request.headers.get("range")
+            if self.drop_at is not None and (not spec or spec.startswith("bytes=0-")):
+                drop_at, self.drop_at = self.drop_at, None
+                return httpx.Response(206 if spec and self.ranges else 200, content=self._dropped(drop_at))
+            if spec and self.ranges:
+                start, _, end = spec[len("bytes="):].partition("-")
+                size = len(self.archive)
+                first, last = (size - int(end), size - 1) if start == "" else (int(start), int(end or size - 1))
+                return httpx.Response(206, content=self.archive[first:last + 1])
+            return httpx.Response(200, content=self.archive)
+        return httpx.Response(404)
+
+    def _dropped(self, drop_at: int):
+        yield self.archive[:drop_at]
+        raise httpx.ReadError("connection reset")
+
+    def hits(self, url: str) -> int:
+        return sum(1 for r in self.requests if str(r.url) == url)
+
+@pytest.fixture
+def github(tmp_path, monkeypatch):
+    monkeypatch.setenv("FORGE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("FORGE_NO_CACHE", raising=False)
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    monkeypatch.delenv("GH_TOKEN", raising=False)
+    monkeypatch.chdir(tmp_path)
+    fake = FakeGitHub(make_zip({"README.md": "hello", ".forge/memory/constitution.md": "rules"}))
+    return fake, httpx.Client(transport=httpx.MockTransport(fake))
+
+def test_repeated_init_revalidates_and_reuses_cached_archive(tmp_path, github):
+    fake, client = github
+    first = download_and_extract_template(tmp_path / "one", "claude", "sh", verbose=False, client=client)
+    second = download_and_extract_template(tmp_path / "two", "claude", "sh", verbose=False, client=client)
+
+    for project in (first, second):
+        assert (project / "README.md").read_text() == "hello"
+        assert (project / ".forge" / "memory" / "constitution.md").exists()
+    assert fake.hits(RELEASE_URL) == 2
+    assert fake.requests[-1].headers["if-none-match"] == '"v1"'
+    assert fake.hits(ASSET_URL) == 1
+    # The archive stays in the cache, not in the working directory
+    assert (tmp_path / "cache" / "archives" / "v1" / ASSET).exists()
+    assert not (tmp_path / ASSET).exists()
+
+def test_no_cache_downloads_every_time(tmp_path, github, monkeypatch):
+    fake, client = github
+    monkeypatch.setenv("FORGE_NO_CACHE", "1")
+    download_and_extract_template(tmp_path / "one", "claude", "sh", verbose=False, client=client)
+    download_and_extract_template(tmp_path / "two", "claude", "sh", verbose=False, client=client)
+    assert fake.hits(ASSET_URL) == 2
+    assert not (tmp_path / "cache").exists()
+    assert not (tmp_path / ASSET).exists()
+
+def test_release_cache_evicts_least_recently_used(tmp_path):
+    cache = ReleaseCache(tmp_path, max_bytes=250)
+    paths = []
+    for i, tag in enumerate(["v1", "v2", "v3"]):
+        path = cache.archive_path(tag, "a.zip")
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"x" * 100)
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+        paths.append(path)
+    # Using v1 makes v2 the least recently used
+    assert cache.get_archive("v1", "a.zip", size=100) == paths[0]
+    cache.evict(keep=[paths[2]])
+    assert [p.exists() for p in paths] == [True, False, True]
+    assert not paths[1].parent.exists()
+    assert cache.archive_path("../evil", "x/../../y.zip").parent.parent == cache.archives_dir
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_extract_into_existing_directory_merges_in_place(tmp_path, github, mocker, pipelined):
+    fake, client = github
+    fake.archive = make_zip({
+        "README.md": "template readme",
+        ".vscode/settings.json": json.dumps({"editor": {"tabSize": 2}, "new": True}),
+        "../escape.txt": "nope",
+        "/abs/evil.txt": "nope",
+    })
+    project = tmp_path / "existing"
+    (project / ".vscode").mkdir(parents=True)
+    (project / ".vscode" / "settings.json").write_text(json.dumps({"editor": {"wordWrap": "on"}}))
+    (project / "src.py").write_text("keep me")
+
+    copy = mocker.spy(shutil, "copy2")
+    download_and_extract_template(
+        project, "claude", "sh", is_current_dir=True, verbose=False, client=client, pipelined=pipelined
+    )
+
+    assert (project / "README.md").read_text() == "template readme"
+    assert (project / "src.py").read_text() == "keep me"
+    settings = json.loads((project / ".vscode" / "settings.json").read_text())
+    assert settings == {"editor": {"wordWrap": "on", "tabSize": 2}, "new": True}
+    # Path traversal is stripped, not followed
+    assert not (tmp_path / "escape.txt").exists()
+    assert (project / "escape.txt").exists() and (project / "abs" / "evil.txt").exists()
+    assert not list(project.glob("forge-template*"))
+    # Files are written once: staged ones are renamed into place, not copied
+    assert copy.call_count == 0
+    assert not list(project.glob(".forge-extract-*"))
+
+@pytest.mark.parametrize("ranges", [True, False])
+def test_pipelined_download_extracts_while_downloading(tmp_path, github, ranges):
+    fake, client = github
+    files = {f"docs/part{i}.bin": os.urandom(40 * 1024) for i in range(8)}
+    files[".forge/memory/constitution.md"] = b"rules"
+    fake.archive = make_zip(files)
+    fake.ranges = ranges
+
+    project = download_and_extract_template(
+        tmp_path / "piped", "claude", "sh", verbose=False, client=client, pipelined=True
+    )
+
+    for name, content in files.items():
+        assert (project / name).read_bytes() == content
+    ranged = [r.headers.get("range") for r in fake.requests if str(r.url) == ASSET_URL]
+    if ranges:
+        # Tail first, then the body up to it
+        tail = 64 * 1024
+        size = len(fake.archive)
+        assert ranged == [f"bytes={size - tail}-{size - 1}", f"bytes=0-{size - tail - 1}"]
+        # Ranges count stored bytes, so responses must not be content-encoded
+        assert all(
+            r.headers["accept-encoding"] == "identity" for r in fake.requests if str(r.url) == ASSET_URL
+        )
+    else:
+        assert ranged[-1] is None
+    assert (tmp_path / "cache" / "archives" / "v1" / ASSET).read_bytes() == fake.archive
+
+def test_pipelined_download_fetches_large_archive_index(tmp_path, github, monkeypatch):
+    from forge import downloader
+    fake, client = github
+    files = {f"docs/{i}.md": f"doc {i}".encode() for i in range(50)}
+    fake.archive = make_zip(files)
+    monkeypatch.setattr(downloader, "PIPELINE_TAIL_BYTES", 100)
+
+    project = download_and_extract_template(
+        tmp_path / "piped", "claude", "sh", verbose=False, client=client, pipelined=True
+    )
+
+    assert all((project / name).read_bytes() == content for name, content in files.items())
+    ranged = [r.headers.get("range") for r in fake.requests if str(r.url) == ASSET_URL]
+    # Tail, the rest of the index, then the body
+    assert len(ranged) == 3 and all(ranged)
+
+def test_interrupted_download_resumes_and_is_verified(tmp_path, github, monkeypatch):
+    import hashlib
+    from forge import downloader
+    fake, client = github
+    fake.archive = make_zip({f"docs/{i}.md": os.urandom(1000) for i in range(20)})
+    fake.digest = "sha256:" + hashlib.sha256(fake.archive).hexdigest()
+    fake.drop_at = 5000
+    monkeypatch.setattr(downloader, "DOWNLOAD_BACKOFF", 0)
+
+    project = download_and_extract_template(tmp_path / "p", "claude", "sh", verbose=False, client=client)
+
+    assert len(list((project / "docs").iterdir())) == 20
+    ranged = [r.headers.get("range") for r in fake.requests if str(r.url) == ASSET_URL]
+    assert ranged == [None, "bytes=5000-"]
+    assert not list((tmp_path / "cache").rglob("*.part"))
+
+def test_checksum_mismatch_keeps_nothing(tmp_path, github, monkeypatch):
+    import typer
+    from forge import downloader
+    fake, client = github
+    fake.digest = "sha256:" + "0" * 64
+    monkeypatch.setattr(downloader, "DOWNLOAD_BACKOFF", 0)
+
+    with pytest.raises(typer.Exit):
+        download_and_extract_template(tmp_path / "p", "claude", "sh", verbose=False, client=client)
+
+    assert not (tmp_path / "p").exists()
+    assert not [p for p in (tmp_path / "cache").rglob("*") if p.is_file() and "archives" in p.parts]
+    # Every attempt started over instead of resuming from the bad bytes
+    assert fake.hits(ASSET_URL) == downloader.DOWNLOAD_ATTEMPTS
+
+def test_pipelined_checksum_mismatch_leaves_existing_project_untouched(tmp_path, github, monkeypatch):
+    import typer
+    from forge import downloader
+    fake, client = github
+    fake.digest = "sha256:" + "0" * 64
+    monkeypatch.setattr(downloader, "DOWNLOAD_BACKOFF", 0)
+    project = tmp_path / "existing"
+    project.mkdir()
+    (project / "README.md").write_text("mine")
+
+    with pytest.raises(typer.Exit):
+        download_and_extract_template(
+            project, "claude", "sh", is_current_dir=True, verbose=False, client=client, pipelined=True
+        )
+
+    assert sorted(p.name for p in project.iterdir()) == ["README.md"]
+    assert (project / "README.md").read_text() == "mine"
+
+def test_pipelined_download_falls_back_when_the_body_fails(tmp_path, github, monkeypatch):
+    from forge import downloader
+    fake, client = github
+    files = {f"docs/part{i}.bin": os.urandom(40 * 1024) for i in range(8)}
+    fake.archive = make_zip(files)
+    fake.drop_at = 10000
+    monkeypatch.setattr(downloader, "DOWNLOAD_BACKOFF", 0)
+
+    project = download_and_extract_template(
+        tmp_path / "piped", "claude", "sh", verbose=False, client=client, pipelined=True
+    )
+
+    assert all((project / name).read_bytes() == content for name, content in files.items())
+    assert not list(tmp_path.glob(".forge-extract-*"))
+    ranged = [r.headers.get("range") for r in fake.requests if str(r.url) == ASSET_URL]
+    # Tail, the failed body, then the sequential download
+    assert len(ranged) == 3 and ranged[-1] is None
+
+def test_pipelined_project_gets_default_permissions(tmp_path, github):
+    import stat
+    fake, client = github
+    reference = tmp_path / "reference"
+    reference.mkdir()
+
+    project = download_and_extract_template(
+        tmp_path / "piped", "claude", "sh", verbose=False, client=client, pipelined=True
+    )
+
+    assert stat.S_IMODE(project.stat().st_mode) == stat.S_IMODE(reference.stat().st_mode)
@@ -0,0 +1,126 @@
+import time
+from pathlib import Path
+from forge.rules import load_rule_blocks
+
+def test_load_rule_blocks_preserves_order(tmp_path, mocker):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"block{i}.md"
+        path.write_text(f"block {i}")
+        paths.append(path)
+    paths.append(tmp_path / "missing" / "gone.md")
+
+    original_read = Path.read_text
+
+    def slow_read(self, *args, **kwargs):
+        # Earlier blocks finish last, so order must come from the input
+        if self.stem.startswith("block"):
+            time.sleep(0.01 * (6 - int(self.stem[len("block"):])))
+        return original_read(self, *args, **kwargs)
+
+    mocker.patch.object(Path, "read_text", slow_read)
+    blocks = list(load_rule_blocks(paths))
+
+    assert blocks[:6] == [f"block {i}" for i in range(6)]
+    assert blocks[6] == "<!-- Missing rule block: missing/gone -->"
+
+def test_forge_rules_compile_streams_atomically(tmp_path, mocker):
+    """A failing block leaves the previous output untouched and no temp files behind."""
+    from typer.testing import CliRunner
+    from forge.cli import app
+    rules_dir = tmp_path / "templates" / "rules"
+    (rules_dir / "roles").mkdir(parents=True)
+    (rules_dir / "roles" / "developer.md").write_text("Role: Developer")
+    mocker.patch("forge.rules.get_rules_dir", return_value=rules_dir)
+    runner = CliRunner()
+
+    with runner.isolated_filesystem(temp_dir=tmp_path):
+        Path(".cursorrules").write_text("previous")
+        mocker.patch("forge.rules.process_template", side_effect=RuntimeError("boom"))
+        result = runner.invoke(app, ["rules", "compile"], env={"FORGE_NO_CACHE": "1"})
+
+        assert result.exit_code != 0
+        assert Path(".cursorrules").read_text() == "previous"
+        assert [p.name for p in Path(".").iterdir() if p.name.endswith(".tmp")] == []
+
+def test_detect_stack_parses_manifests(tmp_path, monkeypatch):
+    from forge.stack import detect_stack
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "pyproject.toml").write_text(
+        '[project]\nname = "api"\ndescription = "not django"\n'
+        'dependencies = ["FastAPI[all]>=0.110"]\n'
+    )
+    (tmp_path / "package.json").write_text(
+        '{"name": "next-gen-ui", "dependencies": {"react": "^18"},'
+        ' "devDependencies": {"typescript": "^5"}}'
+    )
+
+    assert detect_stack(tmp_path) == [
+        "languages/python", "frameworks/fastapi", "languages/typescript", "frameworks/react",
+    ]
+
+def test_detect_stack_workspaces_and_lockfiles(tmp_path, monkeypatch):
+    from forge.stack import detect_stack
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "package.json").write_text('{"private": true, "workspaces": ["apps/*"]}')
+    web = tmp_path / "apps" / "web"
+    web.mkdir(parents=True)
+    (web / "package.json").write_text('{"dependencies": {"next": "14", "tailwindcss": "3"}}')
+    service = tmp_path / "service"
+    service.mkdir()
+    (service / "uv.lock").write_text(
+        '[[package]]\nname = "service"\nsource = { editable = "." }\n'
+        'dependencies = [{ name = "django" }]\n\n'
+        '[[package]]\nname = "django"\nsource = { registry = "https://pypi.org/simple" }\n'
+    )
+
+    assert detect_stack(tmp_path) == ["frameworks/nextjs", "frameworks/tailwind"]
+    assert detect_stack(service) == ["languages/python", "frameworks/django"]
+
+def test_detect_stack_skips_malformed_workspace_globs(tmp_path, monkeypatch):
+    from forge.stack import detect_stack
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "package.json").write_text('{"workspaces": ["/opt/*", "a**", 7, "packages/*"]}')
+    ui = tmp_path / "packages" / "ui"
+    ui.mkdir(parents=True)
+    (ui / "package.json").write_text('{"dependencies": {"react": "18"}}')
+
+    assert "frameworks/react" in detect_stack(tmp_path)
+
+def test_detect_stack_cache_tracks_manifests(tmp_path, monkeypatch, mocker):
+    import forge.stack
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / ".forge").mkdir()
+    (tmp_path / "requirements.txt").write_text("fastapi\n")
+    scan = mocker.spy(forge.stack, "scan_project")
+
+    assert forge.stack.detect_stack(tmp_path) == ["languages/python", "frameworks/fastapi"]
+    assert forge.stack.detect_stack(tmp_path) == ["languages/python", "frameworks/fastapi"]
+    assert scan.call_count == 1
+
+    (tmp_path / "requirements.txt").write_text("django>=5\n")
+    assert forge.stack.detect_stack(tmp_path) == ["languages/python", "frameworks/django"]
+    assert scan.call_count == 2
+
+def test_compile_workspace_writes_each_project(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from forge.cli import app
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "package.json").write_text('{"workspaces": ["packages/*"]}')
+    for name, deps in [("ui", '{"react": "18"}'), ("admin", '{"react": "18"}'), ("api", "{}")]:
+        package = tmp_path / "packages" / name
+        package.mkdir(parents=True)
+        (package / "package.json").write_text(f'{{"dependencies": {deps}}}')
+    ignored = tmp_path / "node_modules" / "dep"
+    ignored.mkdir(parents=True)
+    (ignored / "package.json").write_text("{}")
+
+    result = CliRunner().invoke(app, ["rules", "compile", "--workspace", "--jobs", "2"])
+
+    assert result.exit_code == 0, result.output
+    ui = (tmp_path / "packages" / "ui" / ".cursorrules").read_text()
+    assert ui.startswith("<!-- Context: Phase=")
+    assert ui == (tmp_path / "packages" / "admin" / ".cursorrules").read_text()
+    assert ui != (tmp_path / "packages" / "api" / ".cursorrules").read_text()
+    assert (tmp_path / ".cursorrules").exists()
+    assert not (ignored / ".cursorrules").exists()
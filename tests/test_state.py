@@ -0,0 +1,277 @@
+import json
+import pytest
+from pathlib import Path
+from forge.models import FeatureState, Phase, Status
+from forge.state import StateStore
+
+def test_save_is_atomic(tmp_path, mocker):
+    store = StateStore(tmp_path / ".forge")
+    store.save(FeatureState(name="before"))
+
+    mocker.patch("forge.state.json.dumps", side_effect=RuntimeError("crash"))
+    with pytest.raises(RuntimeError):
+        store.save(FeatureState(name="after"))
+
+    assert store.load().name == "before"
+    assert not list(store.forge_path.glob("*.tmp"))
+
+def test_journal_replay_and_torn_line(tmp_path):
+    store = StateStore(tmp_path / ".forge")
+    store.save(FeatureState(name="feature"))
+    store.append("phase", phase="implement", at="2025-01-01T00:00:00")
+    store.append("task", id="T1", set={"description": "write it", "status": "in_progress"})
+    # Simulate a crash in the middle of an append
+    with open(store.journal_path, "a") as f:
+        f.write('{"seq": 99, "op": "pha')
+    store.append("task", id="T1", set={"status": "completed"})
+
+    state = store.load()
+    assert state.phase == Phase.IMPLEMENT
+    assert state.updated_at == "2025-01-01T00:00:00"
+    assert [(t.id, t.description, t.status) for t in state.tasks] == [("T1", "write it", Status.COMPLETED)]
+    # The snapshot itself was never rewritten
+    assert json.loads(store.state_path.read_text())["phase"] == "init"
+
+def test_compaction_is_idempotent_across_crash(tmp_path, mocker):
+    store = StateStore(tmp_path / ".forge")
+    store.append("task", id="T1", set={"description": "a"})
+    store.append("task", id="T2", set={"description": "b"})
+
+    # Crash after the snapshot is written but before the journal is reset
+    journal = store.journal_path.read_text()
+    store.compact()
+    store.journal_path.write_text(journal)
+    assert [t.id for t in store.load().tasks] == ["T1", "T2"]
+
+    store.append("task", id="T3", set={"description": "c"})
+    assert [t.id for t in store.load().tasks] == ["T1", "T2", "T3"]
+
+def test_journal_compacts_when_large(tmp_path, monkeypatch):
+    monkeypatch.setattr("forge.state.JOURNAL_COMPACT_BYTES", 512)
+    store = StateStore(tmp_path / ".forge")
+    for i in range(20):
+        store.append("task", id=f"T{i}", set={"description": "x" * 20})
+
+    assert store.journal_path.stat().st_size < 512
+    assert len(store.load().tasks) == 20
+    assert json.loads(store.state_path.read_text())["journal_seq"] > 0
+
+def test_task_and_gate_updates_append_only(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from forge.cli import app
+    from forge.state import load_state, save_state
+    monkeypatch.chdir(tmp_path)
+    save_state(FeatureState(name="feature"))
+    snapshot = (tmp_path / ".forge" / "state.json").read_text()
+
+    runner = CliRunner()
+    result = runner.invoke(app, ["state", "task", "T1", "-d", "Add login", "--file", "src/login.py"])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(app, ["state", "task", "T1", "--status", "completed"])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(app, ["state", "gate", "tests", "--failed", "--details", "2 failures"])
+    assert result.exit_code == 0, result.output
+
+    assert (tmp_path / ".forge" / "state.json").read_text() == snapshot
+    state = load_state()
+    assert [(t.id, t.description, t.status, t.file_path) for t in state.tasks] == [
+        ("T1", "Add login", Status.COMPLETED, "src/login.py")
+    ]
+    assert [(g.name, g.passed, g.details) for g in state.quality_gates] == [("tests", False, "2 failures")]
+
+    result = runner.invoke(app, ["state", "show"])
+    assert "T1" in result.output and "tests" in result.output
+
+def test_update_task_rejects_unknown_fields(tmp_path, monkeypatch):
+    from forge.state import update_task
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError):
+        update_task("T1", priority="high")
+
+def test_sqlite_backend_migration_and_queries(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from forge.cli import app
+    from forge.state import latest_quality_gate, load_state, query_tasks, record_quality_gate, update_task
+    from forge.state_sqlite import SqliteStateStore
+    monkeypatch.chdir(tmp_path)
+    update_task("T1", description="a", file_path="src/a.py")
+    update_task("T2", description="b", file_path="src/b.py", status="completed")
+
+    runner = CliRunner()
+    result = runner.invoke(app, ["state", "migrate", "sqlite"])
+    assert result.exit_code == 0, result.output
+    assert not (tmp_path / ".forge" / "state.json").exists()
+
+    update_task("T1", status="in_progress")
+    update_task("T3", description="c", file_path="src/a.py")
+    record_quality_gate("lint", True)
+    record_quality_gate("lint", False, "E501")
+
+    assert [t.id for t in query_tasks(file_path="src/a.py")] == ["T1", "T3"]
+    assert [t.id for t in query_tasks(status=Status.IN_PROGRESS)] == ["T1"]
+    assert latest_quality_gate("lint").details == "E501"
+    conn = SqliteStateStore(tmp_path / ".forge").connect()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+    result = runner.invoke(app, ["tasks", "--status", "pending"])
+    assert result.exit_code == 0, result.output
+    assert "T3" in result.output and "T1" not in result.output
+    assert load_state().phase == Phase.INIT
+
+    before = load_state()
+    result = runner.invoke(app, ["state", "migrate", "json"])
+    assert result.exit_code == 0, result.output
+    assert not (tmp_path / ".forge" / "state.db").exists()
+    after = load_state()
+    assert after.version > 0
+    after.version = before.version
+    assert after.to_dict() == before.to_dict()
+
+def test_sqlite_migration_keeps_repeated_ids_and_fails_cleanly(tmp_path, mocker):
+    from forge.models import Task
+    from forge.state import get_state_store, migrate_state
+    from forge.state_sqlite import SqliteStateStore
+    forge_path = tmp_path / ".forge"
+    StateStore(forge_path).save(FeatureState(name="dup", tasks=[Task("T1", "a"), Task("T1", "b")]))
+
+    # Fails after the database file has been created
+    failing = mocker.patch.object(SqliteStateStore, "_version", side_effect=RuntimeError("disk full"))
+    with pytest.raises(RuntimeError):
+        migrate_state("sqlite", forge_path)
+    # No half-made state.db shadows the JSON state
+    assert not list(forge_path.glob("*state.db*"))
+    assert [t.description for t in get_state_store(forge_path).load().tasks] == ["a", "b"]
+
+    mocker.stop(failing)
+    migrate_state("sqlite", forge_path)
+    store = get_state_store(forge_path)
+    assert isinstance(store, SqliteStateStore)
+    store.append("task", id="T1", set={"status": "completed"})
+    # Like the JSON journal, updates go to the first task with the id
+    assert [(t.description, t.status) for t in store.load().tasks] == [
+        ("a", Status.COMPLETED), ("b", Status.PENDING)
+    ]
+
+def test_feature_shards(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from forge.cli import app
+    from forge.state import load_feature_index, load_state, save_state, update_task
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("FORGE_FEATURE", raising=False)
+    save_state(FeatureState(name="Project"))
+    update_task("T1", description="legacy task")
+
+    runner = CliRunner()
+    # The first feature takes over the existing single-feature state
+    assert runner.invoke(app, ["plan", "User Auth"]).exit_code == 0
+    assert runner.invoke(app, ["plan", "billing"]).exit_code == 0
+    assert runner.invoke(app, ["implement", "--feature", "user-auth"]).exit_code == 0
+    update_task("B1", description="invoice")
+
+    index = load_feature_index()
+    assert index["active"] == "billing"
+    assert sorted(index["features"]) == ["billing", "user-auth"]
+    auth = load_state("user-auth")
+    assert (auth.name, auth.phase, [t.id for t in auth.tasks]) == ("User Auth", Phase.IMPLEMENT, ["T1"])
+    billing = load_state()
+    assert (billing.name, billing.phase, [t.id for t in billing.tasks]) == ("billing", Phase.PLAN, ["B1"])
+    assert (tmp_path / ".forge" / "features" / "billing" / "state.json").exists()
+
+    result = runner.invoke(app, ["optimize", "--feature", "nope"])
+    assert result.exit_code == 1
+    assert not (tmp_path / ".forge" / "features" / "nope").exists()
+
+    # Mistyped features never get a phantom shard, whether named or from the environment
+    features = tmp_path / ".forge" / "features"
+    assert runner.invoke(app, ["state", "task", "T9", "--feature", "biling"]).exit_code == 1
+    result = runner.invoke(app, ["state", "gate", "tests", "--passed"], env={"FORGE_FEATURE": "biling"})
+    assert result.exit_code == 1
+    assert runner.invoke(app, ["state", "show"], env={"FORGE_FEATURE": "biling"}).exit_code == 1
+    assert not (features / "biling").exists()
+    # A stray shard directory is not a feature
+    (features / "ghost").mkdir()
+    assert runner.invoke(app, ["implement", "--feature", "ghost"]).exit_code == 1
+
+def _hammer_state(path, worker, rounds):
+    import os
+    from forge.state import update_state, update_task
+    os.chdir(path)
+
+    def bump(state):
+        state.artifacts["counter"] = str(int(state.artifacts.get("counter", "0")) + 1)
+
+    for i in range(rounds):
+        update_task(f"W{worker}-{i}", description="parallel")
+        update_state(bump)
+
+@pytest.mark.skipif(not hasattr(__import__("os"), "fork"), reason="needs fork")
+def test_parallel_writers_lose_no_updates(tmp_path, monkeypatch):
+    import multiprocessing
+    from forge.state import load_state
+    monkeypatch.setattr("forge.state.JOURNAL_COMPACT_BYTES", 2048)  # compact while others write
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_hammer_state, args=(tmp_path, w, 15)) for w in range(4)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join()
+    assert all(p.exitcode == 0 for p in workers)
+
+    monkeypatch.chdir(tmp_path)
+    state = load_state()
+    assert state.artifacts["counter"] == "60"
+    assert len({t.id for t in state.tasks}) == 60
+    assert state.version >= 120
+
+def test_models_roundtrip_slotted_and_compact(tmp_path):
+    from forge.models import QualityGate, Task
+    state = FeatureState(
+        name="f",
+        phase=Phase.TASKS,
+        tasks=[Task("T1", "a", Status.BLOCKED, "src/a.py"), Task("T2", "b")],
+        quality_gates=[QualityGate("lint", True, "2025-01-01T00:00:00")],
+        artifacts={"plan": "docs/01-plan.md"},
+    )
+    assert not hasattr(state.tasks[0], "__dict__")
+    data = state.to_dict()
+    assert data["tasks"][0]["status"] == "blocked"
+    assert FeatureState.from_dict(json.loads(json.dumps(data))) == state
+
+    store = StateStore(tmp_path / ".forge", compact=True)
+    store.save(state)
+    assert "\n" not in store.state_path.read_text()
+    loaded = store.load()
+    assert (loaded.tasks, loaded.quality_gates, loaded.phase) == (state.tasks, state.quality_gates, Phase.TASKS)
+
+def test_project_root_discovered_from_subdirectory(tmp_path, monkeypatch, mocker):
+    from forge.project import clear_project_root_cache, find_project_root
+    from forge.state import get_forge_path, load_state, save_state, update_phase
+    monkeypatch.chdir(tmp_path)
+    save_state(FeatureState(name="root"))
+    nested = tmp_path / "packages" / "api" / "src"
+    nested.mkdir(parents=True)
+    monkeypatch.chdir(nested)
+    clear_project_root_cache()
+
+    is_dir = mocker.spy(Path, "is_dir")
+    assert get_forge_path() == tmp_path / ".forge"
+    probes = is_dir.call_count
+    assert find_project_root() == tmp_path
+    assert is_dir.call_count == probes  # cached
+
+    update_phase(Phase.TASKS)
+    assert not (nested / ".forge").exists()
+    monkeypatch.chdir(tmp_path)
+    assert load_state().phase == Phase.TASKS
+
+def test_snapshot_parse_is_reused_until_the_file_changes(tmp_path):
+    store = StateStore(tmp_path / ".forge")
+    store.save(FeatureState(name="first", artifacts={"plan": "a.md"}))
+
+    state = store.load()
+    state.artifacts["plan"] = "changed in memory"
+    assert store.load().artifacts == {"plan": "a.md"}
+
+    StateStore(tmp_path / ".forge").save(FeatureState(name="second"))
+    assert store.load().name == "second"
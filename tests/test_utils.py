@@ -34,3 +34,19 @@ def test_is_git_repo_false(mocker, tmp_path):
     # Mock subprocess.run to fail
     mocker.patch("subprocess.run", side_effect=FileNotFoundError)
     assert is_git_repo(tmp_path) is False
+
+def test_http_client_is_shared_and_configurable(monkeypatch):
+    from forge import http
+    from forge.utils import get_client
+    monkeypatch.setattr(http, "_clients", {})
+    monkeypatch.setenv("FORGE_HTTP_TIMEOUT", "12")
+    monkeypatch.setenv("FORGE_HTTP2", "0")
+
+    client = http.get_client()
+    assert get_client() is client
+    assert http.get_client(verify=False) is not client
+    assert client.timeout.read == 12
+    assert client.timeout.connect == http.DEFAULT_CONNECT_TIMEOUT
+
+    http.close_clients()
+    assert client.is_closed and http._clients == {}